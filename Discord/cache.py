@@ -0,0 +1,195 @@
+import asyncio
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from comum.ambiente import ambiente_do_bot
+from comum.metricas import registrar_medidor
+
+
+class _Entrada:
+    __slots__ = ('valor', 'expira_em')
+
+    def __init__(self, valor, expira_em: float):
+        self.valor = valor
+        self.expira_em = expira_em
+
+
+# Quanto esperar pelo lock de outro processo; depois disso a leitura vira falha de cache
+TIMEOUT_BLOQUEIO = 0.5
+
+
+class ArmazenamentoCompartilhado:
+    """Segundo nível dos caches, em SQLite, visto por todos os processos do cluster.
+
+    Quando um processo busca uma cotação ou o clima de uma cidade, os
+    outros encontram o valor aqui em vez de chamar a API de novo.
+
+    Os métodos são bloqueantes: o CacheCoalescente os chama em threads do
+    executor padrão, nunca direto no event loop. Com o banco ocupado
+    por outro processo, uma leitura devolve None e uma escrita é
+    descartada; é só um cache.
+    """
+
+    def __init__(self, caminho_banco: str):
+        self._banco = sqlite3.connect(caminho_banco, timeout=TIMEOUT_BLOQUEIO, check_same_thread=False)
+        # Uma conexão para várias threads: uma operação por vez
+        self._trava = threading.Lock()
+        self._banco.execute("PRAGMA journal_mode=WAL")
+        self._banco.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " nome TEXT NOT NULL,"
+            " chave TEXT NOT NULL,"
+            " valor BLOB NOT NULL,"
+            " expira_em REAL NOT NULL,"
+            " PRIMARY KEY (nome, chave))"
+        )
+        self._banco.commit()
+
+    def ler(self, nome: str, chave):
+        try:
+            with self._trava:
+                linha = self._banco.execute(
+                    "SELECT valor, expira_em FROM cache WHERE nome = ? AND chave = ?", (nome, repr(chave))
+                ).fetchone()
+        except sqlite3.OperationalError as e:
+            print(f"Cache compartilhado indisponível ({e}); buscando direto na API.")
+            return None
+        return None if linha is None else _Entrada(pickle.loads(linha[0]), linha[1])
+
+    def _escrever(self, sql: str, parametros: tuple) -> None:
+        try:
+            with self._trava, self._banco:
+                self._banco.execute(sql, parametros)
+        except sqlite3.OperationalError as e:
+            print(f"Cache compartilhado indisponível ({e}); valor mantido só na memória.")
+
+    def gravar(self, nome: str, chave, valor, expira_em: float) -> None:
+        self._escrever(
+            "INSERT OR REPLACE INTO cache (nome, chave, valor, expira_em) VALUES (?, ?, ?, ?)",
+            (nome, repr(chave), pickle.dumps(valor), expira_em)
+        )
+
+    def remover(self, nome: str, chave) -> None:
+        self._escrever("DELETE FROM cache WHERE nome = ? AND chave = ?", (nome, repr(chave)))
+
+
+# Definido pelo cluster.py; rodando em um único processo o cache fica só em memória
+_banco_cluster = ambiente_do_bot(Path(__file__).resolve().parent, 'discord').get('DISCORD_CLUSTER_DB')
+_compartilhado = ArmazenamentoCompartilhado(_banco_cluster) if _banco_cluster else None
+
+
+class CacheCoalescente:
+    """Cache em memória com expiração, stale-while-revalidate e coalescência.
+
+    - Entradas válidas são devolvidas direto da memória.
+    - Entradas expiradas são devolvidas mesmo assim enquanto uma atualização
+      roda em segundo plano (stale-while-revalidate).
+    - Várias chamadas simultâneas para a mesma chave ausente disparam uma
+      única busca: todas aguardam o mesmo futuro.
+
+    A função `carregar` passada para `obter` deve ser uma corrotina que
+    devolve a tupla (valor, expira_em), com expira_em em segundos de época.
+
+    No cluster, entradas ausentes ou vencidas na memória são procuradas
+    primeiro no ArmazenamentoCompartilhado, e tudo que é buscado ou
+    definido é gravado lá também.
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._entradas = {}
+        self._em_andamento = {}
+        self.acertos = 0
+        self.falhas = 0
+        self.obsoletos = 0
+        self.buscas = 0
+        registrar_medidor(
+            "bot_cache_eventos_total", "Acertos, falhas, respostas obsoletas e buscas de cada cache.",
+            ("cache", "evento"),
+            lambda: {(self.nome, evento): getattr(self, evento) for evento in ('acertos', 'falhas', 'obsoletos', 'buscas')},
+            tipo='counter'
+        )
+        registrar_medidor(
+            "bot_cache_entradas", "Entradas guardadas em cada cache.", ("cache",),
+            lambda: {(self.nome,): len(self._entradas)}
+        )
+
+    async def _entrada(self, chave):
+        entrada = self._entradas.get(chave)
+        if _compartilhado is not None and (entrada is None or time.time() >= entrada.expira_em):
+            # Outro processo do cluster pode já ter buscado um valor mais novo
+            recente = await asyncio.to_thread(_compartilhado.ler, self.nome, chave)
+            if recente is not None and (entrada is None or recente.expira_em > entrada.expira_em):
+                entrada = self._entradas[chave] = recente
+        return entrada
+
+    async def obter(self, chave, carregar):
+        entrada = await self._entrada(chave)
+        if entrada is not None:
+            if time.time() < entrada.expira_em:
+                self.acertos += 1
+                return entrada.valor
+
+            # Entrega o valor antigo e atualiza sem fazer o usuário esperar
+            self.obsoletos += 1
+            self._buscar(chave, carregar)
+            return entrada.valor
+
+        self.falhas += 1
+        # shield: se quem chamou for cancelado, a busca continua para os demais
+        return await asyncio.shield(self._buscar(chave, carregar))
+
+    def _buscar(self, chave, carregar) -> asyncio.Future:
+        futuro = self._em_andamento.get(chave)
+        if futuro is None:
+            futuro = asyncio.ensure_future(self._executar(chave, carregar))
+            futuro.add_done_callback(self._registrar_erro)
+            self._em_andamento[chave] = futuro
+        return futuro
+
+    async def _executar(self, chave, carregar):
+        self.buscas += 1
+        try:
+            valor, expira_em = await carregar()
+            self.definir(chave, valor, expira_em)
+            return valor
+        finally:
+            self._em_andamento.pop(chave, None)
+
+    def _registrar_erro(self, futuro: asyncio.Future) -> None:
+        # Atualizações em segundo plano não têm ninguém aguardando; sem isso o
+        # asyncio reclamaria de "Task exception was never retrieved".
+        if not futuro.cancelled() and futuro.exception() is not None:
+            print(f"Erro ao atualizar o cache '{self.nome}': {futuro.exception()}")
+
+    async def consultar(self, chave) -> tuple:
+        """Lê sem buscar nada: devolve (valor, ainda_valido) ou (None, False)."""
+        entrada = await self._entrada(chave)
+        if entrada is None:
+            return None, False
+        return entrada.valor, time.time() < entrada.expira_em
+
+    def definir(self, chave, valor, expira_em: float) -> None:
+        """Grava um valor obtido por fora (ex.: junto com outra consulta)."""
+        self._entradas[chave] = _Entrada(valor, expira_em)
+        if _compartilhado is not None:
+            # Em segundo plano: quem chamou já tem o valor na memória
+            asyncio.get_running_loop().run_in_executor(None, _compartilhado.gravar, self.nome, chave, valor, expira_em)
+
+    def invalidar(self, chave) -> None:
+        self._entradas.pop(chave, None)
+        if _compartilhado is not None:
+            asyncio.get_running_loop().run_in_executor(None, _compartilhado.remover, self.nome, chave)
+
+    def estatisticas(self) -> dict:
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'obsoletos': self.obsoletos,
+            'buscas': self.buscas,
+            'entradas': len(self._entradas),
+            'em_andamento': len(self._em_andamento),
+        }
@@ -0,0 +1,134 @@
+import asyncio
+import time
+import unicodedata
+from pathlib import Path
+
+import aiohttp
+
+from cache import CacheCoalescente
+from comum.ambiente import ambiente_do_bot
+from comum.cliente_http import http
+
+ambiente = ambiente_do_bot(Path(__file__).resolve().parent, 'discord')
+
+# OPENWEATHER_URL permite apontar para outro servidor (ex.: o falso dos benchmarks)
+URL_OPENWEATHER_BASE = ambiente.get("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5")
+URL_OPENWEATHER = f"{URL_OPENWEATHER_BASE}/weather"
+URL_OPENWEATHER_GRUPO = f"{URL_OPENWEATHER_BASE}/group"
+# O endpoint /group aceita no máximo 20 ids por requisição
+LIMITE_GRUPO = 20
+
+# Nome da cidade → id do OpenWeather: praticamente nunca muda
+TTL_CIDADE = 30 * 86400
+# Nomes que a API não conhece (erros de digitação) ficam bloqueados por 1h
+TTL_CIDADE_INEXISTENTE = 3600
+# Condições atuais: o OpenWeather atualiza a cada ~10 minutos
+TTL_CLIMA = 600
+
+cache_cidades = CacheCoalescente("cidades")
+cache_clima = CacheCoalescente("clima")
+
+
+class CidadeNaoEncontrada(LookupError):
+    """O OpenWeather não reconhece o nome informado."""
+
+
+def normalizar_cidade(cidade: str) -> str:
+    """'  São   Paulo ' e 'SAO PAULO' viram a mesma chave: 'sao paulo'."""
+    sem_acentos = unicodedata.normalize('NFKD', cidade)
+    sem_acentos = ''.join(c for c in sem_acentos if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.casefold().split())
+
+
+def _parametros(**extras) -> dict:
+    return {'appid': ambiente.get('OPENWEATHER_API_KEY'), 'lang': 'pt_br', **extras}
+
+
+async def _resolver_cidade(nome: str):
+    """Busca o id da cidade pelo nome uma única vez (guardado por 30 dias).
+
+    As condições que vêm junto já vão para o cache_clima, então uma cidade
+    nova custa uma única chamada e não entra no /group.
+    """
+    try:
+        dados = await http.get_json(URL_OPENWEATHER, params=_parametros(q=nome))
+    except aiohttp.ClientResponseError as e:
+        if e.status == 404:
+            # Cache negativo: o próximo pedido com o mesmo nome nem sai daqui
+            return None, time.time() + TTL_CIDADE_INEXISTENTE
+        raise
+
+    cache_clima.definir(dados['id'], dados, time.time() + TTL_CLIMA)
+    return dados['id'], time.time() + TTL_CIDADE
+
+
+async def obter_id_cidade(cidade: str) -> int:
+    nome = normalizar_cidade(cidade)
+    if not nome:
+        raise CidadeNaoEncontrada(cidade)
+
+    id_cidade = await cache_cidades.obter(nome, lambda: _resolver_cidade(nome))
+    if id_cidade is None:
+        raise CidadeNaoEncontrada(cidade)
+    return id_cidade
+
+
+async def _buscar_grupo(ids: list) -> None:
+    """Atualiza o cache de várias cidades com uma única requisição."""
+    parametros = _parametros(id=','.join(str(i) for i in ids))
+    dados = await http.get_json(URL_OPENWEATHER_GRUPO, params=parametros)
+    expira_em = time.time() + TTL_CLIMA
+    for item in dados['list']:
+        cache_clima.definir(item['id'], item, expira_em)
+
+
+def _avisar_erro(tarefa: asyncio.Future) -> None:
+    if not tarefa.cancelled() and tarefa.exception() is not None:
+        print(f"Erro ao atualizar o clima em segundo plano: {tarefa.exception()}")
+
+
+async def obter_varios_climas(cidades: list) -> tuple:
+    """Busca o clima de várias cidades com o mínimo de requisições.
+
+    Devolve (resultados, falhas): `resultados` é uma lista de pares
+    (cidade, dados) na ordem pedida e `falhas` um dicionário cidade → motivo.
+    Uma cidade com problema não derruba as demais.
+    """
+    ids = await asyncio.gather(*(obter_id_cidade(c) for c in cidades), return_exceptions=True)
+
+    ausentes, obsoletos = [], []
+    for id_cidade in dict.fromkeys(i for i in ids if isinstance(i, int)):
+        valor, valido = await cache_clima.consultar(id_cidade)
+        if valor is None:
+            ausentes.append(id_cidade)
+        elif not valido:
+            obsoletos.append(id_cidade)
+
+    lotes = [ausentes[i:i + LIMITE_GRUPO] for i in range(0, len(ausentes), LIMITE_GRUPO)]
+    erros_lote = await asyncio.gather(*(_buscar_grupo(lote) for lote in lotes), return_exceptions=True)
+    erro_por_id = {}
+    for lote, erro in zip(lotes, erros_lote):
+        if isinstance(erro, Exception):
+            print(f"Erro ao buscar o clima de um lote de cidades: {erro}")
+            erro_por_id.update(dict.fromkeys(lote, "serviço indisponível"))
+
+    # Os obsoletos são exibidos como estão e atualizados em segundo plano
+    for i in range(0, len(obsoletos), LIMITE_GRUPO):
+        tarefa = asyncio.ensure_future(_buscar_grupo(obsoletos[i:i + LIMITE_GRUPO]))
+        tarefa.add_done_callback(_avisar_erro)
+
+    resultados, falhas = [], {}
+    for cidade, id_cidade in zip(cidades, ids):
+        if isinstance(id_cidade, CidadeNaoEncontrada):
+            falhas[cidade] = "cidade não encontrada"
+        elif isinstance(id_cidade, Exception):
+            falhas[cidade] = "serviço indisponível"
+        elif id_cidade in erro_por_id:
+            falhas[cidade] = erro_por_id[id_cidade]
+        else:
+            dados, _ = await cache_clima.consultar(id_cidade)
+            if dados is None:
+                falhas[cidade] = "sem dados"
+            else:
+                resultados.append((cidade, dados))
+    return resultados, falhas
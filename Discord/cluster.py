@@ -0,0 +1,135 @@
+"""Roda o bot do Discord dividido em vários processos (cluster de shards).
+
+    python cluster.py              sobe os processos e mostra o relatório dos shards
+    python cluster.py --status     só mostra o relatório dos shards em execução
+
+Variáveis de ambiente:
+    DISCORD_TOTAL_SHARDS   total de shards (padrão: o recomendado pelo Discord)
+    DISCORD_PROCESSOS      quantos processos (padrão: número de CPUs, no máximo
+                           um por shard)
+    DISCORD_CLUSTER_DB     banco compartilhado entre os processos (caches e
+                           estado dos shards); padrão: cluster.db nesta pasta
+    METRICAS_PORTA         se definida, o processo N usa a porta METRICAS_PORTA + N
+
+Cada processo recebe um grupo contíguo de shards e roda o main.py com um
+AutoShardedBot restrito a eles. Os temporizadores continuam em um único
+banco, e cada processo agenda só os dos servidores dos seus shards.
+"""
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from shards import EstadoShards
+
+DIRETORIO = Path(__file__).resolve().parent
+
+# O Discord só aceita um IDENTIFY a cada 5 s (max_concurrency = 1)
+INTERVALO_IDENTIFY = 5
+INTERVALO_RELATORIO = 60
+# Um processo que cai é reiniciado após esta espera
+ESPERA_REINICIO = 10
+
+
+def shards_recomendados(token: str) -> int:
+    requisicao = urllib.request.Request(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={'Authorization': f"Bot {token}", 'User-Agent': 'DiscordBot (cluster, 1.0)'}
+    )
+    with urllib.request.urlopen(requisicao, timeout=10) as resposta:
+        return json.load(resposta)['shards']
+
+
+def dividir_shards(total: int, processos: int) -> list:
+    """Grupos contíguos e do mesmo tamanho (±1): [[0, 1], [2, 3], [4]]."""
+    tamanho, sobra = divmod(total, processos)
+    grupos, inicio = [], 0
+    for i in range(processos):
+        fim = inicio + tamanho + (1 if i < sobra else 0)
+        grupos.append(list(range(inicio, fim)))
+        inicio = fim
+    return grupos
+
+
+def _executar_processo(cluster: int, shard_ids: list, total: int, token: str) -> None:
+    """Ponto de entrada de cada processo filho."""
+    os.environ['DISCORD_CLUSTER'] = str(cluster)
+    os.environ['DISCORD_SHARD_IDS'] = ",".join(map(str, shard_ids))
+    os.environ['DISCORD_TOTAL_SHARDS'] = str(total)
+    if os.getenv('METRICAS_PORTA'):
+        os.environ['METRICAS_PORTA'] = str(int(os.environ['METRICAS_PORTA']) + cluster)
+
+    sys.path.insert(0, str(DIRETORIO))
+    spec = importlib.util.spec_from_file_location("bot_discord", DIRETORIO / 'main.py')
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = modulo
+    spec.loader.exec_module(modulo)
+    modulo.bot.run(token)
+
+
+def _iniciar(contexto, cluster: int, shard_ids: list, total: int, token: str):
+    processo = contexto.Process(
+        target=_executar_processo, args=(cluster, shard_ids, total, token), name=f"cluster-{cluster}"
+    )
+    processo.start()
+    print(f"Cluster {cluster} (pid {processo.pid}): shards {shard_ids}")
+    return processo
+
+
+def main() -> None:
+    load_dotenv(DIRETORIO / '.env')
+    os.environ.setdefault('DISCORD_CLUSTER_DB', str(DIRETORIO / 'cluster.db'))
+
+    estado = EstadoShards(os.environ['DISCORD_CLUSTER_DB'])
+    if '--status' in sys.argv[1:]:
+        print(estado.relatorio())
+        return
+
+    token = os.getenv('TOKEN')
+    if not token:
+        print("O token do Discord não foi encontrado! Verifique seu arquivo .env")
+        return
+
+    total = int(os.getenv('DISCORD_TOTAL_SHARDS', '0')) or shards_recomendados(token)
+    processos = max(1, min(int(os.getenv('DISCORD_PROCESSOS', str(os.cpu_count() or 1))), total))
+    grupos = dividir_shards(total, processos)
+    print(f"{total} shard(s) em {processos} processo(s).")
+    estado.limpar()
+
+    # spawn: cada processo começa limpo, sem herdar event loop nem conexões
+    contexto = multiprocessing.get_context('spawn')
+    filhos = {}
+    try:
+        for cluster, shard_ids in enumerate(grupos):
+            filhos[cluster] = _iniciar(contexto, cluster, shard_ids, total, token)
+            # Espaça os IDENTIFY de processos diferentes
+            time.sleep(INTERVALO_IDENTIFY * len(shard_ids))
+
+        proximo_relatorio = time.monotonic() + INTERVALO_RELATORIO
+        while True:
+            time.sleep(ESPERA_REINICIO)
+            for cluster, processo in list(filhos.items()):
+                if not processo.is_alive():
+                    print(f"Cluster {cluster} parou (código {processo.exitcode}); reiniciando.")
+                    filhos[cluster] = _iniciar(contexto, cluster, grupos[cluster], total, token)
+            if time.monotonic() >= proximo_relatorio:
+                print(estado.relatorio())
+                proximo_relatorio = time.monotonic() + INTERVALO_RELATORIO
+    except KeyboardInterrupt:
+        print("Encerrando o cluster...")
+    finally:
+        for processo in filhos.values():
+            processo.terminate()
+        for processo in filhos.values():
+            processo.join(timeout=15)
+        estado.fechar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import time
+from datetime import date, datetime, time as hora, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from cache import CacheCoalescente
+from comum.ambiente import ambiente_do_bot
+from comum.cliente_http import http
+
+ambiente = ambiente_do_bot(Path(__file__).resolve().parent, 'discord')
+
+# FRANKFURTER_URL permite apontar para outro servidor (ex.: o falso dos benchmarks)
+URL_FRANKFURTER = ambiente.get("FRANKFURTER_URL", "https://api.frankfurter.app") + "/latest"
+
+# Moeda em que a tabela completa é buscada. O Frankfurter publica as taxas
+# de referência do BCE, então o euro é a base "natural": qualquer outro par
+# sai da mesma tabela por uma divisão.
+MOEDA_BASE = "EUR"
+
+# O Banco Central Europeu publica as taxas por volta das 16h (horário de
+# Frankfurt) em dias úteis; antes disso não adianta consultar de novo.
+FUSO_BCE = ZoneInfo("Europe/Berlin")
+HORA_PUBLICACAO = hora(16, 0)
+# Em fins de semana e feriados a próxima publicação "esperada" já passou;
+# nesses casos voltamos a conferir com esta frequência.
+NOVA_TENTATIVA_SEGUNDOS = 30 * 60
+
+cache_cotacoes = CacheCoalescente("cotacoes")
+
+
+class MoedaDesconhecida(ValueError):
+    """A moeda pedida não faz parte da tabela do BCE."""
+
+
+class TabelaCotacoes:
+    """Todas as taxas de uma publicação, relativas à MOEDA_BASE."""
+
+    __slots__ = ('taxas', 'data')
+
+    def __init__(self, taxas: dict, data_publicacao: str):
+        self.taxas = taxas
+        self.data = data_publicacao
+
+    def taxa(self, origem: str, destino: str) -> float:
+        """Quanto 1 unidade de `origem` vale em `destino` (cálculo local)."""
+        try:
+            return self.taxas[destino] / self.taxas[origem]
+        except KeyError as e:
+            raise MoedaDesconhecida(e.args[0]) from None
+
+
+def _expiracao(data_cotacao: str) -> float:
+    """Calcula quando a cotação publicada em `data_cotacao` deixa de valer."""
+    dia = date.fromisoformat(data_cotacao)
+    proxima = datetime.combine(dia + timedelta(days=1), HORA_PUBLICACAO, tzinfo=FUSO_BCE)
+    expira_em = proxima.timestamp()
+    return max(expira_em, time.time() + NOVA_TENTATIVA_SEGUNDOS)
+
+
+async def _carregar_tabela():
+    dados = await http.get_json(URL_FRANKFURTER, params={'from': MOEDA_BASE})
+    taxas = {moeda: float(valor) for moeda, valor in dados['rates'].items()}
+    taxas[MOEDA_BASE] = 1.0
+    return TabelaCotacoes(taxas, dados['date']), _expiracao(dados['date'])
+
+
+async def obter_tabela() -> TabelaCotacoes:
+    """Devolve a tabela completa, com uma única requisição por publicação."""
+    return await cache_cotacoes.obter(MOEDA_BASE, _carregar_tabela)
+
+
+async def obter_cotacao(origem: str, destino: str) -> tuple:
+    """Devolve (taxa, data_atualizacao) para o par origem→destino."""
+    tabela = await obter_tabela()
+    return tabela.taxa(origem.upper(), destino.upper()), tabela.data
+
+
+def formatar_valor(valor: float) -> str:
+    """Formata no padrão brasileiro (1.234,56); valores pequenos ganham mais casas."""
+    casas = 2 if valor >= 1 else 4
+    return f"{valor:,.{casas}f}".replace(",", "X").replace(".", ",").replace("X", ".")
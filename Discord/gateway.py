@@ -0,0 +1,72 @@
+"""Perfis de conexão com o gateway do Discord.
+
+O bot só usa slash commands, que chegam como interações independentemente
+das intents. Cada intent a mais faz o Discord mandar eventos (presenças,
+membros, mensagens) que o nextcord processa e guarda em cache, e esse
+custo cresce com o tamanho dos servidores.
+
+DISCORD_PERFIL_GATEWAY escolhe o perfil:
+
+    enxuto    (padrão) só a intent `guilds`, que mantém servidores e canais
+              em cache para o aviso dos temporizadores; sem cache de
+              membros nem de mensagens e sem baixar a lista de membros
+    completo  Intents.all() com os caches padrão do nextcord (o
+              comportamento antigo)
+
+DISCORD_INTENTS_EXTRAS acrescenta intents ao perfil, separadas por vírgula
+(ex.: "members,message_content"), para comandos que venham a precisar.
+"""
+from pathlib import Path
+
+import nextcord
+
+from comum.ambiente import ambiente_do_bot
+
+PERFIL_PADRAO = 'enxuto'
+
+ambiente = ambiente_do_bot(Path(__file__).resolve().parent, 'discord')
+
+
+def _intents_extras(intents: nextcord.Intents) -> nextcord.Intents:
+    for nome in ambiente.get('DISCORD_INTENTS_EXTRAS', '').split(','):
+        nome = nome.strip()
+        if not nome:
+            continue
+        if nome not in nextcord.Intents.VALID_FLAGS:
+            raise ValueError(f"Intent desconhecida em DISCORD_INTENTS_EXTRAS: {nome!r}")
+        setattr(intents, nome, True)
+    return intents
+
+
+def opcoes_do_bot(perfil: str = None) -> dict:
+    """Argumentos de conexão e cache do Bot para o perfil escolhido."""
+    perfil = (perfil or ambiente.get('DISCORD_PERFIL_GATEWAY', PERFIL_PADRAO)).strip().lower()
+
+    if perfil == 'completo':
+        return {'intents': _intents_extras(nextcord.Intents.all())}
+
+    if perfil == 'enxuto':
+        intents = nextcord.Intents.none()
+        # Servidores e canais em cache: bot.get_channel funciona sem chamar a API
+        intents.guilds = True
+        return {
+            'intents': _intents_extras(intents),
+            'member_cache_flags': nextcord.MemberCacheFlags.none(),
+            'max_messages': None,
+            'chunk_guilds_at_startup': False,
+        }
+
+    raise ValueError(f"Perfil de gateway inválido: {perfil!r}. Use 'enxuto' ou 'completo'.")
+
+
+def relatorio_cache(bot) -> str:
+    """Resumo do que o bot está guardando em memória (mostrado no on_ready)."""
+    membros = sum(len(guild.members) for guild in bot.guilds)
+    canais = sum(len(guild.channels) for guild in bot.guilds)
+    mensagens = len(bot.cached_messages)
+    ativas = [nome for nome, ativa in bot.intents if ativa]
+    return (
+        f"{len(bot.guilds)} servidor(es), {canais} canal(is), {membros} membro(s), "
+        f"{len(bot.users)} usuário(s), {mensagens} mensagem(ns) em cache | "
+        f"intents: {', '.join(ativas) or 'nenhuma'}"
+    )
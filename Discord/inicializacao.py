@@ -0,0 +1,65 @@
+"""Inicialização rápida do bot do Discord.
+
+- `Cronometro` mede as etapas da inicialização (imports, criação do bot,
+  login, sincronização) para acompanhar o tempo de cada reinício.
+- `SincroniaComandos` guarda em disco um hash dos slash commands
+  registrados. Se nada mudou desde a última sincronização, o bot não chama
+  de novo os endpoints de registro de comandos (que têm limite de uso).
+"""
+import hashlib
+import json
+import os
+import time
+
+
+class Cronometro:
+    def __init__(self, inicio: float = None):
+        # `inicio` (de time.perf_counter()) permite contar etapas anteriores à criação
+        self._inicio = self._ultimo = time.perf_counter() if inicio is None else inicio
+        self.etapas = []
+
+    def marcar(self, etapa: str) -> None:
+        """Registra quanto tempo passou desde a marcação anterior."""
+        agora = time.perf_counter()
+        self.etapas.append((etapa, agora - self._ultimo))
+        self._ultimo = agora
+
+    def relatorio(self) -> str:
+        total = self._ultimo - self._inicio
+        linhas = [f"{etapa}: {segundos * 1000:.0f} ms" for etapa, segundos in self.etapas]
+        return " | ".join(linhas + [f"total: {total * 1000:.0f} ms"])
+
+
+def assinatura_comandos(comandos, application_id) -> str:
+    """Hash do payload que seria enviado ao Discord para cada comando."""
+    payloads = []
+    for comando in comandos:
+        if comando.is_global:
+            payloads.append(comando.get_payload(None))
+        for guild_id in comando.guild_ids:
+            payloads.append({**comando.get_payload(guild_id), 'guild_id': guild_id})
+    # Ordem estável: o conjunto de comandos do nextcord não tem ordem definida
+    conteudo = sorted(json.dumps(p, sort_keys=True, default=str) for p in payloads)
+    return hashlib.sha256(json.dumps([application_id, conteudo]).encode()).hexdigest()
+
+
+class SincroniaComandos:
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+
+    def _ler(self) -> str:
+        try:
+            with open(self.caminho, encoding='utf-8') as arquivo:
+                return arquivo.read().strip()
+        except OSError:
+            return ''
+
+    def precisa_sincronizar(self, assinatura: str) -> bool:
+        return self._ler() != assinatura
+
+    def salvar(self, assinatura: str) -> None:
+        # Grava em um temporário e troca, para não deixar um hash pela metade
+        temporario = f"{self.caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(assinatura)
+        os.replace(temporario, self.caminho)
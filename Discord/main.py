@@ -1,20 +1,113 @@
-import nextcord
-import os
 import asyncio
-import requests
+import sys
+import time
+from pathlib import Path
+
+# Início da inicialização, antes do import do nextcord
+INICIO = time.perf_counter()
+
+import nextcord
 from nextcord.ext import commands
 from dotenv import load_dotenv
 
-# Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
-TOKEN = os.getenv('TOKEN')
-WEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
+DIRETORIO = Path(__file__).resolve().parent
+
+# Permite importar o pacote compartilhado "comum" da raiz do repositório
+sys.path.insert(0, str(DIRETORIO.parent))
+from comum import metricas
+from comum.ambiente import ambiente_do_bot
+from temporizadores import MotorTemporizadores
+from gateway import opcoes_do_bot, relatorio_cache
+from shards import EstadoShards, shard_do_servidor
+from inicializacao import Cronometro, SincroniaComandos, assinatura_comandos
+# clima, cotacoes, paginador e o cliente HTTP só são importados no primeiro
+# comando que os usa: os comandos de calculadora não pagam por eles
+
+cronometro = Cronometro(INICIO)
+cronometro.marcar("imports (nextcord e módulos do bot)")
+
+# Configurações do bot: DISCORD_<VARIAVEL>, o ambiente ou o .env desta pasta
+ambiente = ambiente_do_bot(DIRETORIO, 'discord')
+TOKEN = ambiente.get('TOKEN')
+TEMPORIZADORES_DB = ambiente.get('TEMPORIZADORES_DB', str(DIRETORIO / 'temporizadores.db'))
+# Hash dos slash commands já enviados ao Discord; DISCORD_FORCAR_SINCRONIA=1 ignora o hash
+COMANDOS_HASH = ambiente.get('DISCORD_COMANDOS_HASH', str(DIRETORIO / 'comandos.sha256'))
+FORCAR_SINCRONIA = ambiente.get('DISCORD_FORCAR_SINCRONIA') == '1'
+
+# Definidos pelo cluster.py: shards atendidos por este processo e o banco
+# compartilhado entre os processos. Sozinho, o bot usa os shards recomendados.
+SHARD_IDS = [int(s) for s in ambiente.get('DISCORD_SHARD_IDS', '').split(',') if s.strip()] or None
+TOTAL_SHARDS = int(ambiente.get('DISCORD_TOTAL_SHARDS', '0')) or None
+CLUSTER = int(ambiente.get('DISCORD_CLUSTER', '0'))
+CLUSTER_DB = ambiente.get('DISCORD_CLUSTER_DB')
+
+class Bot(commands.AutoShardedBot):
+    def slash_command(self, *args, **kwargs):
+        # Todo comando registrado aqui passa a contar chamadas, erros e latência
+        registrar = super().slash_command(*args, **kwargs)
 
-# Define as intenções do bot (Intents)
-intents = nextcord.Intents.all()
+        def decorador(funcao):
+            nome = kwargs.get('name') or (args[0] if args else None) or funcao.__name__
+            return registrar(metricas.medir_comando('discord', '/' + nome, funcao))
+        return decorador
+
+    async def on_connect(self):
+        # Substitui o on_connect do nextcord, que sincroniza todos os comandos a cada início
+        if getattr(self, '_comandos_verificados', False):
+            return
+        self._comandos_verificados = True
+        cronometro.marcar("login e conexão")
+
+        # Mesmo sem sincronizar, os comandos precisam estar no estado local:
+        # as interações são associadas a eles pelo nome quando o ID é desconhecido
+        self.add_all_application_commands()
+        assinatura = assinatura_comandos(self.get_all_application_commands(), self.application_id)
+        # No cluster, só o processo 0 fala com os endpoints de comandos
+        if CLUSTER == 0 and (FORCAR_SINCRONIA or sincronia_comandos.precisa_sincronizar(assinatura)):
+            await self.sync_all_application_commands()
+            sincronia_comandos.salvar(assinatura)
+            cronometro.marcar("sincronização de comandos")
+            print('✅ Slash commands sincronizados com o Discord.')
+        else:
+            cronometro.marcar("verificação de comandos (sem mudanças)")
+
+    async def close(self):
+        # Fecha o pool de conexões HTTP (se chegou a ser usado) e o agendador junto com o bot
+        if 'comum.cliente_http' in sys.modules:
+            await sys.modules['comum.cliente_http'].http.fechar()
+        await motor_temporizadores.parar()
+        await super().close()
+
+sincronia_comandos = SincroniaComandos(COMANDOS_HASH)
 
 # Cria a instância do bot
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Intents e caches vêm do perfil de gateway (DISCORD_PERFIL_GATEWAY, padrão "enxuto")
+bot = Bot(command_prefix="!", shard_ids=SHARD_IDS, shard_count=TOTAL_SHARDS, **opcoes_do_bot())
+# Mede o tempo até o defer/primeira resposta de cada comando
+metricas.instrumentar_respostas(nextcord.InteractionResponse)
+metricas.registrar_medidor(
+    "bot_discord_shard_latencia_segundos", "Latência do heartbeat de cada shard.", ("shard",),
+    lambda: {(str(i),): s.latency for i, s in bot.shards.items() if s.latency != float('inf')}
+)
+
+# Saúde e latência dos shards, lidas pelo relatório do cluster.py
+estado_shards = EstadoShards(CLUSTER_DB) if CLUSTER_DB else None
+tarefa_estado_shards = None
+# O tempo de inicialização é mostrado só no primeiro on_ready
+inicializacao_relatada = False
+
+async def avisar_fim_do_temporizador(temporizador):
+    """Chamado pelo motor quando um temporizador vence (mesmo após um reinício)."""
+    mensagem = f"⏰ **Bip bip, <@{temporizador.usuario_id}>!** O seu temporizador de {temporizador.descricao} acabou!"
+    try:
+        canal = bot.get_channel(temporizador.canal_id) or await bot.fetch_channel(temporizador.canal_id)
+        await canal.send(mensagem)
+    except nextcord.HTTPException:
+        # Sem acesso ao canal: avisa por mensagem direta
+        usuario = bot.get_user(temporizador.usuario_id) or await bot.fetch_user(temporizador.usuario_id)
+        await usuario.send(mensagem)
+
+motor_temporizadores = MotorTemporizadores(TEMPORIZADORES_DB, avisar_fim_do_temporizador)
 
 # --- Eventos do Bot ---
 
@@ -24,8 +117,38 @@ async def on_ready():
     print(f'✅ Login bem-sucedido como {bot.user}!')
     print(f'✅ ID do Bot: {bot.user.id}')
     print('✅ O bot está online e pronto para uso.')
+    print(f'✅ Cache: {relatorio_cache(bot)}')
+    print(f'✅ Shards: {bot.shard_ids or list(bot.shards)} de {bot.shard_count} (cluster {CLUSTER})')
+    global inicializacao_relatada
+    if not inicializacao_relatada:
+        inicializacao_relatada = True
+        cronometro.marcar("até o on_ready")
+        print(f'✅ Inicialização: {cronometro.relatorio()}')
+
+    pertence = None
+    if CLUSTER_DB:
+        # Cada processo agenda só os temporizadores dos servidores dos seus shards
+        pertence = lambda guild_id: shard_do_servidor(guild_id, bot.shard_count) in bot.shards
+    # Recarrega os temporizadores pendentes (on_ready pode rodar de novo após reconexões)
+    motor_temporizadores.iniciar(pertence)
+    await metricas.iniciar_servidor()
+
+    global tarefa_estado_shards
+    if estado_shards is not None and tarefa_estado_shards is None:
+        tarefa_estado_shards = asyncio.create_task(estado_shards.publicar_periodicamente(bot, CLUSTER))
     print('--------------------------------------')
 
+@bot.event
+async def on_shard_disconnect(shard_id):
+    # Publica na hora para o relatório do cluster não esperar o próximo ciclo
+    if estado_shards is not None:
+        await estado_shards.publicar(bot, CLUSTER)
+
+@bot.event
+async def on_shard_resumed(shard_id):
+    if estado_shards is not None:
+        await estado_shards.publicar(bot, CLUSTER)
+
 # --- Comandos de Calculadora (Simples, não precisam de defer) ---
 
 @bot.slash_command(name="somar", description="Soma dois números que você escolher.")
@@ -68,83 +191,120 @@ async def temporizador(interaction: nextcord.Interaction, tempo: int, unidade: s
     elif unidade.lower() == "horas":
         segundos_totais = tempo * 3600
     
+    if tempo <= 0:
+        await interaction.response.send_message("O tempo precisa ser maior que zero.", ephemeral=True)
+        return
+
+    temporizador_criado = await motor_temporizadores.criar(
+        interaction.user.id, interaction.channel_id, segundos_totais, f"{tempo} {unidade}",
+        guild_id=interaction.guild_id
+    )
+
     # Resposta inicial rápida
-    await interaction.response.send_message(f"Ok, {interaction.user.mention}! Temporizador definido para {tempo} {unidade}.")
+    await interaction.response.send_message(f"Ok, {interaction.user.mention}! Temporizador `#{temporizador_criado.id}` definido para {tempo} {unidade}.")
 
-    # Tarefa em segundo plano para enviar o aviso depois
-    async def esperar_e_avisar():
-        await asyncio.sleep(segundos_totais)
-        await interaction.followup.send(f"⏰ **Bip bip, {interaction.user.mention}!** O seu temporizador de {tempo} {unidade} acabou!")
+@bot.slash_command(name="meustimers", description="Lista os seus temporizadores pendentes.")
+async def meus_timers(interaction: nextcord.Interaction):
+    pendentes = await motor_temporizadores.listar(interaction.user.id)
+    if not pendentes:
+        await interaction.response.send_message("Você não tem nenhum temporizador pendente.", ephemeral=True)
+        return
+
+    linhas = [f"`#{t.id}` - {t.descricao} - termina <t:{int(t.prazo)}:R>" for t in pendentes]
+    texto = "⏳ **Seus temporizadores:**\n" + "\n".join(linhas) + "\n\nPara cancelar, use /cancelartimer <ID>."
+    await interaction.response.send_message(texto[:2000], ephemeral=True)
 
-    asyncio.create_task(esperar_e_avisar())
+@bot.slash_command(name="cancelartimer", description="Cancela um dos seus temporizadores.")
+async def cancelar_timer(interaction: nextcord.Interaction, id: int):
+    if await motor_temporizadores.cancelar(interaction.user.id, id):
+        await interaction.response.send_message(f"✅ Temporizador `#{id}` cancelado.", ephemeral=True)
+    else:
+        await interaction.response.send_message("Não encontrei nenhum temporizador seu com esse ID.", ephemeral=True)
 
 # --- Comandos com API (Corrigidos com defer e followup) ---
 
-@bot.slash_command(name="tempo", description="Traz informações sobre o tempo ao vivo.")
-async def tempo(interaction: nextcord.Interaction, cidade: str):
-    # AVISA o Discord que o comando está sendo processado
-    await interaction.response.defer()
+# Limite de cidades por comando, para não transformar um pedido em centenas de páginas
+MAX_CIDADES = 50
 
-    url = (
-        f"https://api.openweathermap.org/data/2.5/weather"
-        f"?q={cidade}&appid={WEATHER_API_KEY}&lang=pt_br"
-    )
+def criar_embed_clima(dados_clima: dict) -> nextcord.Embed:
+    """Monta o embed de uma cidade a partir da resposta do OpenWeather."""
+    # Extração e formatação dos dados
+    nome_cidade = dados_clima['name']
+    temp_kelvin = dados_clima['main']['temp']
+    sensacao_kelvin = dados_clima['main']['feels_like']
+    descricao = dados_clima['weather'][0]['description'].capitalize()
+    umidade = dados_clima['main']['humidity']
+    velocidade_vento = dados_clima['wind']['speed']
+    icone_clima = dados_clima['weather'][0]['icon']
+    url_icone = f"http://openweathermap.org/img/wn/{icone_clima}@2x.png"
+    
+    temperatura_celsius = temp_kelvin - 273.15
+    sensacao_celsius = sensacao_kelvin - 273.15
+    velocidade_vento_kmh = velocidade_vento * 3.6
 
-    try:
-        resposta = requests.get(url, timeout=10)
-        resposta.raise_for_status()
-        dados_clima = resposta.json()
-
-        # Extração e formatação dos dados
-        nome_cidade = dados_clima['name']
-        temp_kelvin = dados_clima['main']['temp']
-        sensacao_kelvin = dados_clima['main']['feels_like']
-        descricao = dados_clima['weather'][0]['description'].capitalize()
-        umidade = dados_clima['main']['humidity']
-        velocidade_vento = dados_clima['wind']['speed']
-        icone_clima = dados_clima['weather'][0]['icon']
-        url_icone = f"http://openweathermap.org/img/wn/{icone_clima}@2x.png"
-        
-        temperatura_celsius = temp_kelvin - 273.15
-        sensacao_celsius = sensacao_kelvin - 273.15
-        velocidade_vento_kmh = velocidade_vento * 3.6
+    # Criação do Embed
+    embed = nextcord.Embed(
+        title=f"🌦️ Clima em {nome_cidade}",
+        description=f"**{descricao}**",
+        color=nextcord.Color.blue()
+    )
+    embed.set_thumbnail(url=url_icone)
+    embed.add_field(name="🌡️ Temperatura", value=f"{temperatura_celsius:.1f}°C", inline=True)
+    embed.add_field(name="🤔 Sensação Térmica", value=f"{sensacao_celsius:.1f}°C", inline=True)
+    embed.add_field(name="💧 Umidade", value=f"{umidade}%", inline=True)
+    embed.add_field(name="🍃 Vento", value=f"{velocidade_vento_kmh:.1f} km/h", inline=True)
+    embed.set_footer(text="Dados fornecidos por OpenWeatherMap")
+    return embed
 
-        # Criação do Embed
-        embed = nextcord.Embed(
-            title=f"🌦️ Clima em {nome_cidade}",
-            description=f"**{descricao}**",
-            color=nextcord.Color.blue()
-        )
-        embed.set_thumbnail(url=url_icone)
-        embed.add_field(name="🌡️ Temperatura", value=f"{temperatura_celsius:.1f}°C", inline=True)
-        embed.add_field(name="🤔 Sensação Térmica", value=f"{sensacao_celsius:.1f}°C", inline=True)
-        embed.add_field(name="💧 Umidade", value=f"{umidade}%", inline=True)
-        embed.add_field(name="🍃 Vento", value=f"{velocidade_vento_kmh:.1f} km/h", inline=True)
-        embed.set_footer(text="Dados fornecidos por OpenWeatherMap")
+@bot.slash_command(name="tempo", description="Traz informações sobre o tempo ao vivo (várias cidades separadas por vírgula).")
+async def tempo(interaction: nextcord.Interaction, cidades: str):
+    # AVISA o Discord que o comando está sendo processado
+    await interaction.response.defer()
+    from clima import obter_varios_climas
+    from paginador import Paginador
 
-        # ENVIA a resposta final usando followup
-        await interaction.followup.send(embed=embed)
+    # "São Paulo, Recife; Lisboa" → ["São Paulo", "Recife", "Lisboa"]
+    lista_cidades = [c.strip() for c in cidades.replace(";", ",").split(",") if c.strip()]
+    if not lista_cidades:
+        await interaction.followup.send("Informe ao menos uma cidade. Ex: /tempo cidades: Recife, Lisboa")
+        return
+    ignoradas = lista_cidades[MAX_CIDADES:]
+    lista_cidades = lista_cidades[:MAX_CIDADES]
 
+    try:
+        resultados, falhas = await obter_varios_climas(lista_cidades)
+        paginas = [criar_embed_clima(dados) for _, dados in resultados]
     except Exception as e:
         print(f"Ocorreu um erro no comando /tempo: {e}")
+        await interaction.followup.send("❌ Desculpe, não consegui buscar o tempo agora. Tente novamente mais tarde.")
+        return
+
+    avisos = []
+    if ignoradas:
+        avisos.append(f"limite de {MAX_CIDADES} cidades; ignoradas: {', '.join(ignoradas)}")
+    avisos.extend(f"'{cidade}': {motivo}" for cidade, motivo in falhas.items())
+    aviso = None
+    if avisos:
+        # Mensagens do Discord têm no máximo 2000 caracteres
+        aviso = ("⚠️ " + "; ".join(avisos))[:1900]
+
+    if not paginas:
         # ENVIA a mensagem de erro usando followup
-        await interaction.followup.send(f"❌ Não consegui encontrar o tempo para a cidade '{cidade}'. Verifique se o nome está correto e tente novamente.")
+        await interaction.followup.send(f"❌ Não consegui encontrar o tempo para as cidades informadas. Verifique se os nomes estão corretos e tente novamente.\n{aviso}")
+    elif len(paginas) == 1:
+        await interaction.followup.send(content=aviso, embed=paginas[0])
+    else:
+        paginador = Paginador(paginas, interaction.user.id)
+        await interaction.followup.send(content=aviso, embed=paginas[0], view=paginador)
 
 @bot.slash_command(name="dolar", description="Traz a cotação do dólar ao vivo.")
 async def dolar(interaction: nextcord.Interaction):
     # AVISA o Discord que o comando está sendo processado
     await interaction.response.defer()
+    from cotacoes import obter_cotacao
     
-    url = "https://api.frankfurter.app/latest?from=USD&to=BRL"
-
     try:
-        resposta = requests.get(url, timeout=10)
-        resposta.raise_for_status()
-        
-        dados = resposta.json()
-        
-        taxa_brl = float(dados['rates']['BRL'])
-        data_atualizacao = dados['date']
+        taxa_brl, data_atualizacao = await obter_cotacao('USD', 'BRL')
         
         embed = nextcord.Embed(
             title="💵 Cotação do Dólar",
@@ -165,17 +325,10 @@ async def dolar(interaction: nextcord.Interaction):
 async def euro(interaction: nextcord.Interaction):
     # AVISA o Discord que o comando está sendo processado
     await interaction.response.defer()
+    from cotacoes import obter_cotacao
     
-    url = "https://api.frankfurter.app/latest?from=EUR&to=BRL"
-
     try:
-        resposta = requests.get(url, timeout=10)
-        resposta.raise_for_status()
-        
-        dados = resposta.json()
-        
-        taxa_brl = float(dados['rates']['BRL'])
-        data_atualizacao = dados['date']
+        taxa_brl, data_atualizacao = await obter_cotacao('EUR', 'BRL')
         
         embed = nextcord.Embed(
             title="💶 Cotação do Euro",
@@ -192,5 +345,55 @@ async def euro(interaction: nextcord.Interaction):
         # ENVIA a mensagem de erro usando followup
         await interaction.followup.send("❌ Desculpe, não consegui buscar a cotação do Euro agora. Tente novamente mais tarde.")
 
+@bot.slash_command(name="cotacao", description="Traz a cotação de várias moedas de uma vez.")
+async def cotacao(interaction: nextcord.Interaction, moedas: str, base: str = "BRL"):
+    # AVISA o Discord que o comando está sendo processado
+    await interaction.response.defer()
+    from cotacoes import MoedaDesconhecida, formatar_valor, obter_tabela
+
+    # Aceita "USD EUR GBP" ou "USD, EUR, GBP"
+    codigos = list(dict.fromkeys(moedas.replace(",", " ").upper().split()))
+    base = base.strip().upper()
+    if not codigos:
+        await interaction.followup.send("Informe ao menos uma moeda. Ex: /cotacao moedas: USD EUR GBP")
+        return
+
+    try:
+        # Uma única tabela atende todos os pares; o resto é cálculo local
+        tabela = await obter_tabela()
+    except Exception as e:
+        print(f"Ocorreu um erro no comando /cotacao: {e}")
+        await interaction.followup.send("❌ Desculpe, não consegui buscar as cotações agora. Tente novamente mais tarde.")
+        return
+
+    if base not in tabela.taxas:
+        await interaction.followup.send(f"❌ A moeda base '{base}' não está disponível.")
+        return
+
+    embed = nextcord.Embed(
+        title=f"💱 Cotações em {base}",
+        color=nextcord.Color.gold()
+    )
+    desconhecidas = []
+    # Um embed comporta no máximo 25 campos
+    for codigo in codigos[:25]:
+        try:
+            taxa = tabela.taxa(codigo, base)
+        except MoedaDesconhecida:
+            desconhecidas.append(codigo)
+            continue
+        embed.add_field(name=codigo, value=f"1 {codigo} = **{formatar_valor(taxa)} {base}**", inline=True)
+
+    if desconhecidas:
+        embed.description = f"Moedas não encontradas: {', '.join(desconhecidas)}"
+    embed.set_footer(text=f"Dados do Banco Central Europeu | Atualizado em: {tabela.data}")
+
+    await interaction.followup.send(embed=embed)
+
+cronometro.marcar("criação do bot e comandos")
+
 # --- Inicia o Bot ---
-bot.run(TOKEN)
+if __name__ == '__main__':
+    # Sozinho, as configurações gerais (ex.: METRICAS_PORTA) também vêm do .env
+    load_dotenv(DIRETORIO / '.env')
+    bot.run(TOKEN)
@@ -0,0 +1,36 @@
+import nextcord
+
+
+class Paginador(nextcord.ui.View):
+    """Mostra uma lista de embeds, um por vez, com botões ◀ e ▶."""
+
+    def __init__(self, paginas: list, autor_id: int, timeout: float = 300):
+        super().__init__(timeout=timeout)
+        self.paginas = paginas
+        self.autor_id = autor_id
+        self.atual = 0
+        for numero, pagina in enumerate(paginas, 1):
+            pagina.set_footer(text=f"{pagina.footer.text or ''} | Página {numero}/{len(paginas)}".lstrip(" |"))
+        self._atualizar_botoes()
+
+    def _atualizar_botoes(self) -> None:
+        self.anterior.disabled = self.atual == 0
+        self.proxima.disabled = self.atual >= len(self.paginas) - 1
+
+    async def interaction_check(self, interaction: nextcord.Interaction) -> bool:
+        # Só quem executou o comando pode trocar de página
+        return interaction.user.id == self.autor_id
+
+    async def _mostrar(self, interaction: nextcord.Interaction) -> None:
+        self._atualizar_botoes()
+        await interaction.response.edit_message(embed=self.paginas[self.atual], view=self)
+
+    @nextcord.ui.button(label="◀", style=nextcord.ButtonStyle.secondary)
+    async def anterior(self, button: nextcord.ui.Button, interaction: nextcord.Interaction):
+        self.atual = max(self.atual - 1, 0)
+        await self._mostrar(interaction)
+
+    @nextcord.ui.button(label="▶", style=nextcord.ButtonStyle.secondary)
+    async def proxima(self, button: nextcord.ui.Button, interaction: nextcord.Interaction):
+        self.atual = min(self.atual + 1, len(self.paginas) - 1)
+        await self._mostrar(interaction)
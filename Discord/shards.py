@@ -0,0 +1,100 @@
+"""Estado dos shards do bot, compartilhado entre os processos do cluster.
+
+Cada processo grava periodicamente, em uma tabela SQLite, a latência e a
+situação de cada um dos seus shards; o cluster.py lê a mesma tabela para
+mostrar o relatório de todos eles.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+INTERVALO_PUBLICACAO = 30
+# Sem notícias de um shard por mais que isso, ele é dado como fora do ar
+LIMITE_SILENCIO = 3 * INTERVALO_PUBLICACAO
+
+
+def shard_do_servidor(guild_id: int, total_shards: int) -> int:
+    """Fórmula do Discord; mensagens diretas (sem servidor) ficam com o shard 0."""
+    if not guild_id:
+        return 0
+    return (guild_id >> 22) % total_shards
+
+
+class EstadoShards:
+    def __init__(self, caminho_banco: str):
+        # publicar grava em uma thread, para o banco travado não segurar os heartbeats
+        self._banco = sqlite3.connect(caminho_banco, timeout=10, check_same_thread=False)
+        self._trava = threading.Lock()
+        self._banco.execute("PRAGMA journal_mode=WAL")
+        self._banco.execute(
+            "CREATE TABLE IF NOT EXISTS shards ("
+            " shard_id INTEGER PRIMARY KEY,"
+            " cluster INTEGER NOT NULL,"
+            " pid INTEGER NOT NULL,"
+            " conectado INTEGER NOT NULL,"
+            " latencia REAL,"
+            " servidores INTEGER NOT NULL,"
+            " atualizado_em REAL NOT NULL)"
+        )
+        self._banco.commit()
+
+    def limpar(self) -> None:
+        """Esquece os shards de execuções anteriores (o total pode ter mudado)."""
+        self._banco.execute("DELETE FROM shards")
+        self._banco.commit()
+
+    async def publicar(self, bot, cluster: int) -> None:
+        """Grava a situação atual dos shards deste processo."""
+        servidores = {}
+        for guild in bot.guilds:
+            servidores[guild.shard_id] = servidores.get(guild.shard_id, 0) + 1
+        agora = time.time()
+        linhas = []
+        for shard_id, shard in bot.shards.items():
+            latencia = shard.latency
+            # Antes do primeiro heartbeat a latência é infinita
+            linhas.append((
+                shard_id, cluster, os.getpid(), int(not shard.is_closed()),
+                latencia if latencia != float('inf') else None,
+                servidores.get(shard_id, 0), agora
+            ))
+        try:
+            await asyncio.to_thread(self._gravar, linhas)
+        except sqlite3.Error as e:
+            print(f"Erro ao publicar o estado dos shards: {e}")
+
+    def _gravar(self, linhas: list) -> None:
+        with self._trava, self._banco:
+            self._banco.executemany(
+                "INSERT OR REPLACE INTO shards (shard_id, cluster, pid, conectado, latencia, servidores, atualizado_em)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                linhas
+            )
+
+    def ler(self) -> list:
+        return self._banco.execute(
+            "SELECT shard_id, cluster, pid, conectado, latencia, servidores, atualizado_em FROM shards ORDER BY shard_id"
+        ).fetchall()
+
+    def relatorio(self) -> str:
+        agora = time.time()
+        linhas = [f"{'shard':>5} {'cluster':>7} {'pid':>7} {'estado':<12} {'latência':>9} {'servidores':>10}"]
+        for shard_id, cluster, pid, conectado, latencia, servidores, atualizado_em in self.ler():
+            if agora - atualizado_em > LIMITE_SILENCIO:
+                estado = "sem resposta"
+            else:
+                estado = "conectado" if conectado else "reconectando"
+            ms = f"{latencia * 1000:.0f} ms" if latencia is not None else "-"
+            linhas.append(f"{shard_id:>5} {cluster:>7} {pid:>7} {estado:<12} {ms:>9} {servidores:>10}")
+        return "\n".join(linhas)
+
+    async def publicar_periodicamente(self, bot, cluster: int) -> None:
+        while not bot.is_closed():
+            await self.publicar(bot, cluster)
+            await asyncio.sleep(INTERVALO_PUBLICACAO)
+
+    def fechar(self) -> None:
+        with self._trava:
+            self._banco.close()
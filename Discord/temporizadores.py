@@ -0,0 +1,224 @@
+import asyncio
+import heapq
+import sqlite3
+import threading
+import time
+
+from comum.metricas import ATRASO_JOBS
+
+
+COLUNAS = "id, usuario_id, canal_id, prazo, descricao, guild_id"
+
+
+class Temporizador:
+    __slots__ = ('id', 'usuario_id', 'canal_id', 'prazo', 'descricao', 'guild_id')
+
+    def __init__(self, id: int, usuario_id: int, canal_id: int, prazo: float, descricao: str, guild_id: int = None):
+        self.id = id
+        self.usuario_id = usuario_id
+        self.canal_id = canal_id
+        self.prazo = prazo
+        self.descricao = descricao
+        self.guild_id = guild_id
+
+
+class MotorTemporizadores:
+    """Agenda todos os temporizadores com um único laço e uma min-heap.
+
+    Em vez de uma corrotina dormindo para cada temporizador, existe uma
+    só tarefa que dorme até o prazo mais próximo. Cada temporizador é
+    gravado em SQLite no momento em que é criado, então nada se perde
+    quando o bot reinicia; os que venceram enquanto ele estava fora
+    disparam assim que o laço começa.
+
+    `disparar` é a corrotina chamada com o Temporizador quando ele vence.
+
+    Com o bot dividido em vários processos (cluster.py), todos usam o
+    mesmo banco, mas cada processo só agenda os temporizadores dos
+    servidores dos seus shards (`pertence` em `iniciar`). O banco é a
+    fonte da verdade: listar e cancelar enxergam os temporizadores de
+    todos os processos, e um temporizador só dispara se ainda estiver lá.
+
+    O acesso ao banco roda em threads (asyncio.to_thread): com o banco
+    travado por outro processo, quem espera é a thread, não o event loop
+    com os heartbeats dos shards.
+    """
+
+    def __init__(self, caminho_banco: str, disparar):
+        self._disparar = disparar
+        # timeout: no cluster outros processos podem estar escrevendo
+        self._banco = sqlite3.connect(caminho_banco, timeout=10, check_same_thread=False)
+        # Uma conexão para várias threads: uma operação por vez
+        self._trava = threading.Lock()
+        self._banco.execute("PRAGMA journal_mode=WAL")
+        self._banco.execute(
+            "CREATE TABLE IF NOT EXISTS temporizadores ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " usuario_id INTEGER NOT NULL,"
+            " canal_id INTEGER NOT NULL,"
+            " prazo REAL NOT NULL,"
+            " descricao TEXT NOT NULL,"
+            " guild_id INTEGER)"
+        )
+        colunas = [linha[1] for linha in self._banco.execute("PRAGMA table_info(temporizadores)")]
+        if 'guild_id' not in colunas:
+            # Bancos criados antes do cluster: temporizadores antigos ficam com o shard 0
+            self._banco.execute("ALTER TABLE temporizadores ADD COLUMN guild_id INTEGER")
+        self._banco.execute("CREATE INDEX IF NOT EXISTS temporizadores_usuario ON temporizadores (usuario_id)")
+        self._banco.commit()
+
+        self._heap = []            # (prazo, id)
+        self._ativos = {}          # id → Temporizador
+        self._por_usuario = {}     # usuario_id → {id: Temporizador}
+        self._acordar = asyncio.Event()
+        self._tarefa = None
+        self._disparos = set()     # mantém referência aos envios em andamento
+        self._pertence = None      # filtro por shard; None = processo único
+
+    # --- Índices em memória ---
+
+    def _indexar(self, temporizador: Temporizador) -> None:
+        if temporizador.id in self._ativos:
+            # Criado enquanto a carga inicial ainda lia o banco
+            return
+        self._ativos[temporizador.id] = temporizador
+        self._por_usuario.setdefault(temporizador.usuario_id, {})[temporizador.id] = temporizador
+        heapq.heappush(self._heap, (temporizador.prazo, temporizador.id))
+
+    async def _desindexar(self, temporizador: Temporizador) -> bool:
+        """Tira o temporizador da memória e do banco.
+
+        Devolve False se ele já não estava no banco (cancelado por outro
+        processo do cluster).
+        """
+        # A entrada da heap é descartada de forma preguiçosa pelo laço
+        self._ativos.pop(temporizador.id, None)
+        do_usuario = self._por_usuario.get(temporizador.usuario_id)
+        if do_usuario is not None:
+            do_usuario.pop(temporizador.id, None)
+            if not do_usuario:
+                del self._por_usuario[temporizador.usuario_id]
+        apagados = await asyncio.to_thread(
+            self._executar, "DELETE FROM temporizadores WHERE id = ?", (temporizador.id,)
+        )
+        return apagados.rowcount > 0
+
+    # --- Banco (chamado sempre em uma thread) ---
+
+    def _executar(self, sql: str, parametros: tuple = ()) -> sqlite3.Cursor:
+        with self._trava, self._banco:
+            return self._banco.execute(sql, parametros)
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> list:
+        with self._trava:
+            return self._banco.execute(sql, parametros).fetchall()
+
+    def _fechar(self) -> None:
+        with self._trava:
+            self._banco.close()
+
+    # --- API pública ---
+
+    def iniciar(self, pertence=None) -> None:
+        """Inicia o laço (uma vez só), que começa recarregando os pendentes.
+
+        `pertence(guild_id)` diz se um servidor é atendido por este processo;
+        sem ele, todos os temporizadores do banco são agendados aqui.
+        """
+        if self._tarefa is not None:
+            return
+        self._pertence = pertence
+        self._tarefa = asyncio.create_task(self._laco())
+
+    async def parar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            self._tarefa = None
+        await asyncio.to_thread(self._fechar)
+
+    async def criar(self, usuario_id: int, canal_id: int, segundos: float, descricao: str, guild_id: int = None) -> Temporizador:
+        prazo = time.time() + segundos
+        cursor = await asyncio.to_thread(
+            self._executar,
+            "INSERT INTO temporizadores (usuario_id, canal_id, prazo, descricao, guild_id) VALUES (?, ?, ?, ?, ?)",
+            (usuario_id, canal_id, prazo, descricao, guild_id)
+        )
+
+        temporizador = Temporizador(cursor.lastrowid, usuario_id, canal_id, prazo, descricao, guild_id)
+        mais_proximo = not self._heap or prazo < self._heap[0][0]
+        self._indexar(temporizador)
+        if mais_proximo:
+            # O laço está dormindo até um prazo mais distante
+            self._acordar.set()
+        return temporizador
+
+    async def listar(self, usuario_id: int) -> list:
+        """Temporizadores do usuário, do mais próximo ao mais distante."""
+        if self._pertence is not None:
+            # No cluster, os temporizadores do usuário podem estar em outros processos
+            linhas = await asyncio.to_thread(
+                self._consultar,
+                f"SELECT {COLUNAS} FROM temporizadores WHERE usuario_id = ? ORDER BY prazo", (usuario_id,)
+            )
+            return [Temporizador(*linha) for linha in linhas]
+        return sorted(self._por_usuario.get(usuario_id, {}).values(), key=lambda t: t.prazo)
+
+    async def cancelar(self, usuario_id: int, id_temporizador: int) -> bool:
+        temporizador = self._por_usuario.get(usuario_id, {}).get(id_temporizador)
+        if temporizador is not None:
+            return await self._desindexar(temporizador)
+        if self._pertence is not None:
+            # Agendado em outro processo: apagar do banco basta para ele não disparar
+            apagados = await asyncio.to_thread(
+                self._executar,
+                "DELETE FROM temporizadores WHERE id = ? AND usuario_id = ?", (id_temporizador, usuario_id)
+            )
+            return apagados.rowcount > 0
+        return False
+
+    # --- Laço de agendamento ---
+
+    async def _carregar(self) -> None:
+        """Recarrega os temporizadores pendentes; os vencidos disparam logo em seguida."""
+        for linha in await asyncio.to_thread(self._consultar, f"SELECT {COLUNAS} FROM temporizadores"):
+            temporizador = Temporizador(*linha)
+            if self._pertence is None or self._pertence(temporizador.guild_id):
+                self._indexar(temporizador)
+
+    async def _laco(self) -> None:
+        await self._carregar()
+        while True:
+            # Descarta entradas de temporizadores já cancelados
+            while self._heap and self._heap[0][1] not in self._ativos:
+                heapq.heappop(self._heap)
+
+            self._acordar.clear()
+            if not self._heap:
+                await self._acordar.wait()
+                continue
+
+            espera = self._heap[0][0] - time.time()
+            if espera > 0:
+                try:
+                    await asyncio.wait_for(self._acordar.wait(), timeout=espera)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, id_temporizador = heapq.heappop(self._heap)
+            temporizador = self._ativos[id_temporizador]
+            if not await self._desindexar(temporizador):
+                # Cancelado por outro processo do cluster
+                continue
+
+            # O envio roda à parte para um canal lento não atrasar os demais
+            tarefa = asyncio.create_task(self._executar_disparo(temporizador))
+            self._disparos.add(tarefa)
+            tarefa.add_done_callback(self._disparos.discard)
+
+    async def _executar_disparo(self, temporizador: Temporizador) -> None:
+        ATRASO_JOBS.observar(max(time.time() - temporizador.prazo, 0), 'discord')
+        try:
+            await self._disparar(temporizador)
+        except Exception as e:
+            print(f"Erro ao disparar o temporizador {temporizador.id}: {e}")
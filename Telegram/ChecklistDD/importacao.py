@@ -0,0 +1,76 @@
+import csv
+import io
+import re
+import uuid
+from datetime import datetime
+
+from tarefas import FORMATO_DATA, criar_tarefa
+
+# Tarefas aceitas por importação e tamanho máximo do arquivo enviado
+LIMITE_TAREFAS = 1000
+LIMITE_ARQUIVO = 1024 * 1024
+
+# "DD/MM/AAAA - descrição", "DD/MM/AAAA, descrição" (CSV), com ; ou tab
+_LINHA = re.compile(r'^\s*(\d{1,2}/\d{1,2}/\d{4})\s*[-,;\t]\s*(.*?)\s*$')
+
+
+def _descricao(texto: str) -> str:
+    # Campo entre aspas do CSV: "Comprar pão, leite" → Comprar pão, leite
+    if len(texto) >= 2 and texto[0] == texto[-1] == '"':
+        return texto[1:-1].replace('""', '"').strip()
+    return texto
+
+
+def ler_tarefas(texto: str, chat_id: int) -> tuple:
+    """Interpreta todas as linhas de uma vez; as tarefas ficam associadas a `chat_id`.
+
+    Devolve (tarefas, erros), com erros no formato [(número da linha, motivo)].
+    Linhas em branco e o cabeçalho do CSV exportado são ignorados.
+    """
+    tarefas, erros = [], []
+    for numero, linha in enumerate(texto.splitlines(), 1):
+        if not linha.strip():
+            continue
+        encontrado = _LINHA.match(linha)
+        if encontrado is None:
+            if numero == 1 and 'prazo' in linha.casefold():
+                continue
+            erros.append((numero, "formato inválido"))
+            continue
+
+        prazo_str, descricao = encontrado.group(1), _descricao(encontrado.group(2))
+        if not descricao:
+            erros.append((numero, "descrição vazia"))
+            continue
+        try:
+            prazo = datetime.strptime(prazo_str, FORMATO_DATA).date()
+        except ValueError:
+            erros.append((numero, f"data inválida ({prazo_str})"))
+            continue
+
+        if len(tarefas) >= LIMITE_TAREFAS:
+            erros.append((numero, f"limite de {LIMITE_TAREFAS} tarefas por importação"))
+            break
+        tarefas.append(criar_tarefa(str(uuid.uuid4()), descricao, prazo, chat_id))
+    return tarefas, erros
+
+
+def decodificar(dados: bytes) -> str:
+    """Arquivos salvos no Excel/Windows às vezes não estão em UTF-8."""
+    try:
+        return dados.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return dados.decode('latin-1')
+
+
+def exportar_csv(tarefas: list) -> io.BytesIO:
+    """CSV (prazo,descricao) na ordem da lista, pronto para ser importado de volta."""
+    arquivo = io.BytesIO()
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    escritor = csv.writer(texto)
+    escritor.writerow(('prazo', 'descricao'))
+    escritor.writerows((tarefa['prazo'], tarefa['descricao']) for tarefa in tarefas)
+    texto.flush()
+    texto.detach()
+    arquivo.seek(0)
+    return arquivo
@@ -1,10 +1,26 @@
-import os 
+import sys
 import uuid
 import logging
+from pathlib import Path
 from dotenv import load_dotenv 
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes, PicklePersistence
-from datetime import datetime, timedelta
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, ContextTypes, MessageHandler, filters
+from datetime import datetime, time
+from zoneinfo import ZoneInfo
+
+DIRETORIO = Path(__file__).resolve().parent
+
+# Permite importar o pacote compartilhado "comum" da raiz do repositório
+sys.path.insert(0, str(DIRETORIO.parents[1]))
+from comum.agenda_persistente import POLITICAS
+from comum.ambiente import ambiente_do_bot
+from comum.fila_envio import FilaEnvio
+from comum.execucao import executar
+from comum.paginacao import escapar_markdown, montar_pagina, posicao_do_callback, resumir
+from comum.telegram_base import abrir_persistencia, construir_aplicacao
+from tarefas import criar_tarefa, inserir_tarefa, inserir_tarefas, obter_tarefas, remover_tarefa
+from resumo import CHAVE_INDICE_ANTIGA, IndiceVencimentos, reconstruir_indice, remover_vencimento, varredura_perdida, varrer
+from importacao import LIMITE_ARQUIVO, decodificar, exportar_csv, ler_tarefas
 
 # --- Configuração Inicial ---
 logging.basicConfig(
@@ -13,21 +29,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-TOKEN = os.getenv("TELEGRAM_TOKEN")
+# Configurações do bot: CHECKLIST_<VARIAVEL>, o ambiente ou o .env desta pasta
+ambiente = ambiente_do_bot(DIRETORIO, "checklist")
+TOKEN = ambiente.get("TELEGRAM_TOKEN")
+
+# Fuso usado para os horários das varreduras diárias
+FUSO = ZoneInfo(ambiente.get("FUSO_HORARIO", "America/Sao_Paulo"))
+HORA_RESUMO_DIA = time(hour=9, tzinfo=FUSO)
+HORA_RESUMO_VESPERA = time(hour=18, tzinfo=FUSO)
+
+# Varredura perdida com o bot desligado: enviar | descartar | janela (com TOLERANCIA_ATRASO em segundos)
+POLITICA_ATRASO = ambiente.get("POLITICA_ATRASO", "enviar")
+if POLITICA_ATRASO not in POLITICAS:
+    raise ValueError(f"Política de atraso inválida: {POLITICA_ATRASO!r}. Use uma de {POLITICAS}.")
+TOLERANCIA_ATRASO = float(ambiente.get("TOLERANCIA_ATRASO", "3600"))
+
+# Usuários e chats com tarefas vencendo em cada dia, usado pelas varreduras
+vencimentos = IndiceVencimentos(ambiente.get("VENCIMENTOS_DB", str(DIRETORIO / "vencimentos.db")))
+
+# Envio dos resumos respeitando os limites do Telegram
+fila_envio = FilaEnvio(trabalhadores=int(ambiente.get("TRABALHADORES_ENVIO", "4")))
 
 
 # --- Funções de Callback para Jobs ---
 
-async def enviar_lembrete(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Função genérica chamada pelo JobQueue para enviar uma mensagem de lembrete."""
-    try:
-        job_data = context.job.data
-        chat_id = job_data['chat_id']
-        mensagem = job_data['mensagem']
-        await context.bot.send_message(chat_id=chat_id, text=mensagem)
-    except Exception as e:
-        logger.error(f"Erro ao enviar lembrete para o chat_id {context.job.data.get('chat_id', 'N/A')}: {e}")
+async def enviar_lembrete(context: ContextTypes.DEFAULT_TYPE, chat_id: int, mensagem: str) -> None:
+    """Coloca a mensagem na fila de envio; erros e limites do Telegram são tratados lá."""
+    fila_envio.enviar(chat_id, mensagem)
+
+
+async def resumo_do_dia(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Varredura das 09:00: uma mensagem por chat com tudo que vence hoje."""
+    await varrer(context, vencimentos, "resumo_do_dia", FUSO, 0, "⏰ HOJE É O DIA! Estas tarefas vencem hoje:", enviar_lembrete)
+
+
+async def resumo_de_vespera(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Varredura das 18:00: uma mensagem por chat com tudo que vence amanhã."""
+    await varrer(context, vencimentos, "resumo_de_vespera", FUSO, 1, "🔔 Lembrete de Véspera! Estas tarefas vencem amanhã:", enviar_lembrete)
 
 
 # --- Funções de Comando ---
@@ -51,7 +89,11 @@ async def tutorial(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         "🔹 /listartarefas\n"
         "   _Mostra todas as suas tarefas, ordenadas por urgência._\n\n"
         "🔹 /deletartarefa <Número da Tarefa>\n"
-        "   _Apaga uma tarefa da sua lista._"
+        "   _Apaga uma tarefa da sua lista._\n\n"
+        "🔹 /importartarefas\n"
+        "   _Várias tarefas de uma vez, uma por linha (DD/MM/AAAA - Descrição), na mensagem ou em um arquivo .csv/.txt._\n\n"
+        "🔹 /exportartarefas\n"
+        "   _Envia suas tarefas em um arquivo CSV._"
     )
     await update.message.reply_text(texto_tutorial, parse_mode='Markdown')
 
@@ -76,35 +118,12 @@ async def criar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         try:
             data_do_prazo = datetime.strptime(prazo_str, '%d/%m/%Y')
 
-            nova_tarefa = {'id': str(uuid.uuid4()), 'descricao': descricao, 'prazo': prazo_str}
-            
-            if 'tarefas' not in context.user_data:
-                context.user_data['tarefas'] = []
-            context.user_data['tarefas'].append(nova_tarefa)
-
-            # Agendamento de notificações
-            chat_id = update.effective_chat.id
-            notificacao_dia = data_do_prazo.replace(hour=9, minute=0, second=0)
-            notificacao_vespera = (data_do_prazo - timedelta(days=1)).replace(hour=18, minute=0, second=0)
-
-            msg_dia = f"⏰ HOJE É O DIA: Sua tarefa '{descricao}' vence hoje!"
-            msg_vespera = f"🔔 Lembrete de Véspera: Sua tarefa '{descricao}' vence amanhã!"
-            
-            if notificacao_dia > datetime.now():
-                context.job_queue.run_once(
-                    enviar_lembrete, 
-                    notificacao_dia, 
-                    data={'chat_id': chat_id, 'mensagem': msg_dia}, 
-                    name=f"job_dia_{nova_tarefa['id']}"
-                )
-
-            if notificacao_vespera > datetime.now():
-                context.job_queue.run_once(
-                    enviar_lembrete, 
-                    notificacao_vespera, 
-                    data={'chat_id': chat_id, 'mensagem': msg_vespera},
-                    name=f"job_vespera_{nova_tarefa['id']}"
-                )
+            # O prazo é convertido uma única vez aqui e a lista continua ordenada
+            nova_tarefa = criar_tarefa(str(uuid.uuid4()), descricao, data_do_prazo.date(), update.effective_chat.id)
+            inserir_tarefa(context.user_data, nova_tarefa)
+
+            # As notificações saem nas varreduras diárias; basta indexar o prazo
+            vencimentos.registrar((nova_tarefa['ordinal'],), update.effective_user.id, update.effective_chat.id)
 
             msg_sucesso = f"✅ Tarefa salva e lembretes agendados!\n\n*Tarefa:* {descricao}\n*Prazo:* {prazo_str}"
             await update.message.reply_text(msg_sucesso, parse_mode='Markdown')
@@ -115,25 +134,50 @@ async def criar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text("Formato inválido! 😬\nUse: /criartarefa <Prazo DD/MM/AAAA> - <Descrição>")
 
 
+def _linha_tarefa(posicao: int, tarefa: dict) -> str:
+    # O número mostrado é a posição na lista ordenada, usada no /deletartarefa
+    return f"*{posicao + 1}* - {escapar_markdown(resumir(tarefa['descricao']))} _(Prazo: {tarefa['prazo']})_\n"
+
+
+def pagina_de_tarefas(tarefas: list, user_id: int, inicio: int = 0) -> tuple:
+    """Texto e botões da página de /listartarefas que começa em `inicio`."""
+    return montar_pagina(
+        tarefas, inicio, _linha_tarefa,
+        cabecalho="📝 *Suas tarefas (ordenadas por urgência):*\n\n",
+        rodape="",
+        # O dono da lista vai no callback: em grupos, só ele pode paginar
+        prefixo=f"tarefas:{user_id}"
+    )
+
+
 async def listar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Lista todas as tarefas do usuário, ordenadas por prazo."""
-    tarefas = context.user_data.get('tarefas')
+    """Mostra a primeira página das tarefas do usuário, ordenadas por prazo."""
+    # A lista já está ordenada por prazo: cada página é só uma fatia dela
+    tarefas = obter_tarefas(context.user_data)
     if not tarefas:
         await update.message.reply_text("Você ainda não tem tarefas cadastradas. Use /criartarefa para adicionar uma!")
         return
-    
-    try:
-        tarefas_ordenadas = sorted(tarefas, key=lambda t: datetime.strptime(t['prazo'], '%d/%m/%Y'))
-    except (ValueError, TypeError) as e:
-        logger.error(f"Erro ao ordenar tarefas para o chat {update.effective_chat.id}: {e}")
-        await update.message.reply_text("Ocorreu um erro ao tentar ordenar suas tarefas devido a um formato de data inválido em uma delas.")
+
+    texto, teclado = pagina_de_tarefas(tarefas, update.effective_user.id)
+    await update.message.reply_text(texto, parse_mode='Markdown', reply_markup=teclado)
+
+
+async def mudar_pagina_tarefas(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Botões ◀/▶ da lista: renderiza só a página pedida."""
+    consulta = update.callback_query
+    dono = int(consulta.data.split(':')[1])
+    if consulta.from_user.id != dono:
+        await consulta.answer("Essa lista é de outra pessoa. Use /listartarefas para ver a sua.")
         return
 
-    texto_final = "📝 *Suas tarefas (ordenadas por urgência):*\n\n"
-    for indice, tarefa in enumerate(tarefas_ordenadas, 1):
-        texto_final += f"*{indice}* - {tarefa['descricao']} _(Prazo: {tarefa['prazo']})_\n"
+    await consulta.answer()
+    tarefas = obter_tarefas(context.user_data)
+    if not tarefas:
+        await consulta.edit_message_text("Você não tem mais tarefas cadastradas.")
+        return
 
-    await update.message.reply_text(texto_final, parse_mode='Markdown')
+    texto, teclado = pagina_de_tarefas(tarefas, dono, posicao_do_callback(consulta.data))
+    await consulta.edit_message_text(texto, parse_mode='Markdown', reply_markup=teclado)
 
 
 async def deletar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -148,52 +192,146 @@ async def deletar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         return
 
     indice = int(argumento) - 1
-    lista_original = context.user_data.get('tarefas')
+    tarefas = obter_tarefas(context.user_data)
 
-    if not lista_original:
+    if not tarefas:
         await update.message.reply_text("Você não tem nenhuma tarefa para deletar.")
         return
 
-    try:
-        tarefas_ordenadas = sorted(lista_original, key=lambda t: datetime.strptime(t['prazo'], '%d/%m/%Y'))
-    except (ValueError, TypeError) as e:
-        logger.error(f"Erro ao ordenar tarefas para deleção no chat {update.effective_chat.id}: {e}")
-        await update.message.reply_text("Ocorreu um erro ao processar suas tarefas. Verifique se todas têm datas válidas.")
-        return
-
-    if not (0 <= indice < len(tarefas_ordenadas)):
+    if not (0 <= indice < len(tarefas)):
         await update.message.reply_text("Número de tarefa inválido. Use /listartarefas para ver os números.")
         return
 
-    tarefa_a_deletar = tarefas_ordenadas[indice]
-    id_a_deletar = tarefa_a_deletar['id']
-
-    context.user_data['tarefas'] = [t for t in lista_original if t['id'] != id_a_deletar]
+    # A posição na lista ordenada é o número mostrado em /listartarefas
+    tarefa_a_deletar = remover_tarefa(context.user_data, indice)
+    remover_vencimento(vencimentos, context.user_data, tarefa_a_deletar, update.effective_user.id)
     
     descricao_deletada = tarefa_a_deletar['descricao']
     msg_confirmacao = f"🗑️ Tarefa '{descricao_deletada}' foi deletada com sucesso."
     await update.message.reply_text(msg_confirmacao)
 
 
-# --- Função Principal ---
+async def importar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Cria várias tarefas de uma vez, a partir do texto da mensagem ou de um arquivo."""
+    mensagem = update.message
+    documento = mensagem.document or (mensagem.reply_to_message and mensagem.reply_to_message.document)
 
-def main() -> None:
-    """Inicia o bot e o mantém rodando."""
-    if not TOKEN:
-        logging.critical("O token do Telegram não foi encontrado! Verifique seu arquivo .env")
+    if documento:
+        if documento.file_size and documento.file_size > LIMITE_ARQUIVO:
+            await mensagem.reply_text("Arquivo grande demais. O limite é de 1 MB.")
+            return
+        arquivo = await documento.get_file()
+        texto = decodificar(bytes(await arquivo.download_as_bytearray()))
+    else:
+        # Tudo que vem depois do comando, inclusive nas linhas seguintes
+        partes = (mensagem.text or "").split(None, 1)
+        texto = partes[1] if len(partes) == 2 else ""
+
+    if not texto.strip():
+        await mensagem.reply_text(
+            "Envie as tarefas junto com o comando, uma por linha:\n\n"
+            "/importartarefas\n"
+            "25/12/2025 - Comprar presentes\n"
+            "31/12/2025 - Reservar o restaurante\n\n"
+            "Ou mande um arquivo .csv/.txt com /importartarefas na legenda."
+        )
         return
 
-    persistence = PicklePersistence(filepath="bot_persistence")
-    application = Application.builder().token(TOKEN).persistence(persistence).build()
+    novas, erros = ler_tarefas(texto, update.effective_chat.id)
+
+    if novas:
+        # Um único merge na lista ordenada e uma única atualização do índice
+        inserir_tarefas(context.user_data, novas)
+        vencimentos.registrar((t['ordinal'] for t in novas), update.effective_user.id, update.effective_chat.id)
+        # Grava a importação agora, em vez de esperar o próximo ciclo da persistência.
+        # O PTB só marca o usuário como alterado depois que o handler termina,
+        # então a marcação é feita aqui antes do flush.
+        context.application.mark_data_for_update_persistence(
+            user_ids=[update.effective_user.id], chat_ids=[update.effective_chat.id]
+        )
+        await context.application.update_persistence()
+
+    resposta = f"✅ {len(novas)} tarefa(s) importada(s)."
+    if erros:
+        resposta += f"\n\n⚠️ {len(erros)} linha(s) ignorada(s):\n"
+        resposta += "\n".join(f"Linha {numero}: {motivo}" for numero, motivo in erros[:10])
+        if len(erros) > 10:
+            resposta += f"\n... e mais {len(erros) - 10}."
+    await mensagem.reply_text(resposta)
+
+
+async def exportar(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Envia todas as tarefas em um arquivo CSV (que pode ser importado de volta)."""
+    tarefas = obter_tarefas(context.user_data)
+    if not tarefas:
+        await update.message.reply_text("Você ainda não tem tarefas cadastradas. Use /criartarefa para adicionar uma!")
+        return
+
+    await update.message.reply_document(
+        document=exportar_csv(tarefas),
+        filename="tarefas.csv",
+        caption=f"📝 {len(tarefas)} tarefa(s), ordenadas por prazo."
+    )
+
+
+# --- Função Principal ---
+
+async def preparar_resumos(application: Application) -> None:
+    """Agenda as duas varreduras diárias (o total de jobs não depende do número de tarefas).
+
+    Se o bot estava desligado no horário de uma delas hoje, ela roda já ao iniciar.
+    """
+    if not vencimentos.construido():
+        # Primeira execução com o índice em SQLite: indexa as tarefas que já existiam
+        antigo = application.bot_data.pop(CHAVE_INDICE_ANTIGA, None)
+        await reconstruir_indice(application, vencimentos, application.persistence.ids_usuarios(), antigo)
+
+    for callback, horario in ((resumo_do_dia, HORA_RESUMO_DIA), (resumo_de_vespera, HORA_RESUMO_VESPERA)):
+        nome = callback.__name__
+        application.job_queue.run_daily(callback, horario, name=nome)
+        if varredura_perdida(vencimentos, nome, horario, FUSO, POLITICA_ATRASO, TOLERANCIA_ATRASO):
+            # O bot estava desligado no horário de hoje: roda agora
+            logger.info(f"Recuperando a varredura '{nome}' de hoje.")
+            application.job_queue.run_once(callback, 0, name=nome)
+
+
+def criar_aplicacao(token: str, persistencia=None, request=None) -> Application:
+    """Monta o bot com todos os handlers, sem iniciá-lo.
+
+    `persistencia` e `request` permitem trocar o armazenamento e o
+    transporte do Telegram (usado pelos benchmarks).
+    """
+    application = construir_aplicacao(
+        token, "checklist", persistencia or abrir_persistencia(DIRETORIO, "checklist"), fila_envio,
+        ao_iniciar=preparar_resumos, request=request
+    )
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("tutorial", tutorial))
     application.add_handler(CommandHandler("criartarefa", criar))
     application.add_handler(CommandHandler("listartarefas", listar))
     application.add_handler(CommandHandler("deletartarefa", deletar))
+    application.add_handler(CommandHandler("importartarefas", importar))
+    # Arquivos chegam com o comando na legenda, que o CommandHandler não olha
+    application.add_handler(MessageHandler(filters.Document.ALL & filters.CaptionRegex(r"^/importartarefas"), importar))
+    application.add_handler(CommandHandler("exportartarefas", exportar))
+    application.add_handler(CallbackQueryHandler(mudar_pagina_tarefas, pattern=r"^tarefas:\d+:\d+$"))
+    return application
+
+
+def main() -> None:
+    """Inicia o bot e o mantém rodando."""
+    # Sozinho, as configurações gerais (MODO_ATUALIZACAO, WEBHOOK_*, METRICAS_PORTA) também vêm do .env
+    load_dotenv(DIRETORIO / ".env")
+    if not TOKEN:
+        logging.critical("O token do Telegram não foi encontrado! Verifique seu arquivo .env")
+        return
+
+    application = criar_aplicacao(TOKEN)
     
     logger.info("Bot iniciado...")
-    application.run_polling()
+    # Polling por padrão; MODO_ATUALIZACAO=webhook usa o servidor embutido
+    executar(application)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,188 @@
+import logging
+import sqlite3
+from datetime import datetime
+
+from comum.agenda_persistente import DESCARTAR, JANELA
+from tarefas import obter_tarefas, tarefas_do_dia
+
+logger = logging.getLogger(__name__)
+
+# Versões antigas guardavam o índice em bot_data['vencimentos'] (ordinal → {user_id: chat_id});
+# ele só é lido uma vez, para migrar para o IndiceVencimentos
+CHAVE_INDICE_ANTIGA = 'vencimentos'
+
+
+class IndiceVencimentos:
+    """Quais (usuário, chat) têm alguma tarefa vencendo em cada dia.
+
+    Fica em uma tabela SQLite própria, fora do bot_data: assim não é
+    serializado de novo a cada flush da persistência, e cada alteração
+    grava só as linhas do próprio usuário. As varreduras usam o índice
+    para não precisar abrir os dados de todos os usuários.
+
+    A tabela `varreduras` guarda o último dia em que cada varredura rodou,
+    para recuperar no início a que se perdeu com o bot desligado.
+    """
+
+    def __init__(self, caminho_banco: str):
+        self._banco = sqlite3.connect(caminho_banco)
+        self._banco.execute(
+            "CREATE TABLE IF NOT EXISTS vencimentos ("
+            " ordinal INTEGER NOT NULL,"
+            " user_id INTEGER NOT NULL,"
+            " chat_id INTEGER NOT NULL,"
+            " PRIMARY KEY (ordinal, user_id, chat_id))"
+        )
+        self._banco.execute(
+            "CREATE TABLE IF NOT EXISTS varreduras ("
+            " nome TEXT PRIMARY KEY,"
+            " ordinal INTEGER NOT NULL)"
+        )
+        self._banco.commit()
+
+    def construido(self) -> bool:
+        # user_version marca que o índice já foi montado a partir das tarefas salvas
+        return self._banco.execute("PRAGMA user_version").fetchone()[0] >= 1
+
+    def substituir(self, linhas) -> None:
+        with self._banco:
+            self._banco.execute("DELETE FROM vencimentos")
+            self._banco.executemany("INSERT OR IGNORE INTO vencimentos VALUES (?, ?, ?)", linhas)
+            self._banco.execute("PRAGMA user_version = 1")
+
+    def registrar(self, ordinais, user_id: int, chat_id: int) -> None:
+        """Indexa de uma vez os prazos de uma ou várias tarefas (cada dia uma única vez)."""
+        with self._banco:
+            self._banco.executemany(
+                "INSERT OR IGNORE INTO vencimentos VALUES (?, ?, ?)",
+                ((ordinal, user_id, chat_id) for ordinal in set(ordinais))
+            )
+
+    def remover(self, ordinal: int, user_id: int, chat_id: int) -> None:
+        with self._banco:
+            self._banco.execute(
+                "DELETE FROM vencimentos WHERE ordinal = ? AND user_id = ? AND chat_id = ?", (ordinal, user_id, chat_id)
+            )
+
+    def do_dia(self, ordinal: int) -> list:
+        return self._banco.execute(
+            "SELECT user_id, chat_id FROM vencimentos WHERE ordinal = ?", (ordinal,)
+        ).fetchall()
+
+    def esquecer_anteriores(self, ordinal: int) -> None:
+        """Dias que já passaram não serão mais varridos."""
+        with self._banco:
+            self._banco.execute("DELETE FROM vencimentos WHERE ordinal < ?", (ordinal,))
+
+    def ultima_varredura(self, nome: str):
+        linha = self._banco.execute("SELECT ordinal FROM varreduras WHERE nome = ?", (nome,)).fetchone()
+        return None if linha is None else linha[0]
+
+    def marcar_varredura(self, nome: str, ordinal: int) -> None:
+        with self._banco:
+            self._banco.execute("INSERT OR REPLACE INTO varreduras VALUES (?, ?)", (nome, ordinal))
+
+    def fechar(self) -> None:
+        self._banco.close()
+
+
+def chat_da_tarefa(tarefa: dict, user_id: int) -> int:
+    # Tarefas antigas não guardavam o chat; no privado, chat_id == user_id
+    return tarefa.get('chat_id', user_id)
+
+
+def tarefas_do_chat(user_data: dict, ordinal: int, user_id: int, chat_id: int) -> list:
+    return [t for t in tarefas_do_dia(user_data, ordinal) if chat_da_tarefa(t, user_id) == chat_id]
+
+
+def remover_vencimento(indice: IndiceVencimentos, user_data: dict, tarefa: dict, user_id: int) -> None:
+    """Tira (usuário, chat) do índice do dia se não sobrou tarefa nesse dia e nesse chat."""
+    chat_id = chat_da_tarefa(tarefa, user_id)
+    if not tarefas_do_chat(user_data, tarefa['ordinal'], user_id, chat_id):
+        indice.remover(tarefa['ordinal'], user_id, chat_id)
+
+
+async def carregar_user_data(application, user_id: int) -> dict:
+    """user_data de qualquer usuário, mesmo fora de um handler dele.
+
+    Com persistência preguiçosa os dados podem ainda não estar em memória.
+    """
+    user_data = application.user_data[user_id]
+    if application.persistence is not None:
+        await application.persistence.refresh_user_data(user_id, user_data)
+    return user_data
+
+
+async def reconstruir_indice(application, indice: IndiceVencimentos, ids_usuarios, antigo: dict = None) -> None:
+    """Monta o índice a partir das tarefas já salvas (uma vez, na migração).
+
+    `antigo` é o índice que ficava no bot_data: ele diz em qual chat cada
+    usuário tinha tarefas em cada dia, e esse chat passa a ser gravado na
+    própria tarefa.
+    """
+    antigo = antigo or {}
+    linhas, alterados = set(), []
+    for user_id in ids_usuarios:
+        user_data = await carregar_user_data(application, user_id)
+        alterado = False
+        for tarefa in obter_tarefas(user_data):
+            if 'chat_id' not in tarefa:
+                tarefa['chat_id'] = antigo.get(tarefa['ordinal'], {}).get(user_id, user_id)
+                alterado = True
+            linhas.add((tarefa['ordinal'], user_id, tarefa['chat_id']))
+        if alterado:
+            alterados.append(user_id)
+
+    indice.substituir(linhas)
+    if alterados:
+        application.mark_data_for_update_persistence(user_ids=alterados)
+    logger.info(f"Índice de vencimentos reconstruído com {len(linhas)} entrada(s).")
+
+
+def varredura_perdida(indice: IndiceVencimentos, nome: str, horario, fuso, politica: str, tolerancia: float) -> bool:
+    """Diz se a varredura de hoje já deveria ter rodado e não rodou (bot desligado).
+
+    Só a ocorrência de hoje é recuperada: a de dias anteriores já não
+    serve, e a próxima varredura cobre as mesmas tarefas. A política de
+    atraso é a mesma dos lembretes (POLITICA_ATRASO / TOLERANCIA_ATRASO).
+    """
+    agora = datetime.now(fuso)
+    prevista = datetime.combine(agora.date(), horario)
+    ultima = indice.ultima_varredura(nome)
+    # Sem registro (primeira execução), não há o que recuperar
+    if agora < prevista or ultima is None or ultima >= agora.date().toordinal():
+        return False
+
+    atraso = (agora - prevista).total_seconds()
+    if politica == DESCARTAR or (politica == JANELA and atraso > tolerancia):
+        logger.info(f"Varredura '{nome}' de hoje perdida e descartada pela política de atraso ({atraso:.0f}s).")
+        indice.marcar_varredura(nome, agora.date().toordinal())
+        return False
+    return True
+
+
+async def varrer(context, indice: IndiceVencimentos, nome: str, fuso, dias_a_frente: int, cabecalho: str, enviar) -> None:
+    """Envia uma única mensagem por chat com as tarefas que vencem no dia alvo.
+
+    `enviar(context, chat_id, texto)` é a corrotina que entrega a mensagem.
+    Ao terminar, registra que a varredura `nome` rodou hoje.
+    """
+    hoje = datetime.now(fuso).date().toordinal()
+    alvo = hoje + dias_a_frente
+    indice.esquecer_anteriores(hoje)
+
+    linhas_por_chat = {}
+    for user_id, chat_id in indice.do_dia(alvo):
+        user_data = await carregar_user_data(context.application, user_id)
+        tarefas = tarefas_do_chat(user_data, alvo, user_id, chat_id)
+        if not tarefas:
+            # Todas as tarefas do dia nesse chat foram apagadas
+            indice.remover(alvo, user_id, chat_id)
+            continue
+        linhas_por_chat.setdefault(chat_id, []).extend(f"• {t['descricao']}" for t in tarefas)
+
+    for chat_id, linhas in linhas_por_chat.items():
+        await enviar(context, chat_id, cabecalho + "\n" + "\n".join(linhas))
+    indice.marcar_varredura(nome, hoje)
+
+    logger.info(f"Varredura de {datetime.fromordinal(alvo):%d/%m/%Y}: {len(linhas_por_chat)} chat(s) avisado(s).")
@@ -0,0 +1,77 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+from heapq import merge
+
+FORMATO_DATA = '%d/%m/%Y'
+
+# Versão do formato de user_data['tarefas']:
+#   1 - lista sem ordem, prazo só como texto 'DD/MM/AAAA'
+#   2 - lista sempre ordenada por prazo, com o prazo já convertido em ordinal
+VERSAO = 2
+
+
+def _chave(tarefa: dict) -> int:
+    return tarefa['ordinal']
+
+
+def _ordinal(prazo_str: str) -> int:
+    try:
+        return datetime.strptime(prazo_str, FORMATO_DATA).toordinal()
+    except (ValueError, TypeError):
+        # Data corrompida: vai para o fim da lista em vez de quebrar tudo
+        return date.max.toordinal()
+
+
+def obter_tarefas(user_data: dict) -> list:
+    """Devolve a lista de tarefas do usuário, ordenada por prazo.
+
+    Dados salvos no formato antigo são convertidos na primeira leitura:
+    o prazo é interpretado uma única vez e a lista é ordenada uma única vez.
+    """
+    tarefas = user_data.setdefault('tarefas', [])
+    if user_data.get('tarefas_versao') != VERSAO:
+        for tarefa in tarefas:
+            tarefa['ordinal'] = _ordinal(tarefa['prazo'])
+        tarefas.sort(key=_chave)
+        user_data['tarefas_versao'] = VERSAO
+    return tarefas
+
+
+def criar_tarefa(id_tarefa: str, descricao: str, prazo: date, chat_id: int) -> dict:
+    return {
+        'id': id_tarefa,
+        'descricao': descricao,
+        'prazo': prazo.strftime(FORMATO_DATA),
+        'ordinal': prazo.toordinal(),
+        # Chat onde a tarefa foi criada, para onde vão os resumos dela
+        'chat_id': chat_id,
+    }
+
+
+def inserir_tarefa(user_data: dict, tarefa: dict) -> None:
+    """Insere mantendo a ordem; tarefas com o mesmo prazo ficam na ordem de criação."""
+    insort(obter_tarefas(user_data), tarefa, key=_chave)
+
+
+def inserir_tarefas(user_data: dict, novas: list) -> None:
+    """Insere várias tarefas de uma vez: ordena só as novas e intercala com as existentes.
+
+    O custo é O(n + m log m) em vez de m inserções com deslocamento da lista.
+    """
+    tarefas = obter_tarefas(user_data)
+    novas = sorted(novas, key=_chave)
+    # merge é estável: no mesmo prazo, as tarefas já existentes vêm antes
+    tarefas[:] = merge(tarefas, novas, key=_chave)
+
+
+def remover_tarefa(user_data: dict, indice: int) -> dict:
+    """Remove a tarefa na posição `indice` (0 = prazo mais próximo)."""
+    return obter_tarefas(user_data).pop(indice)
+
+
+def tarefas_do_dia(user_data: dict, ordinal: int) -> list:
+    """Tarefas com prazo no dia `ordinal`, achadas por busca binária."""
+    tarefas = obter_tarefas(user_data)
+    inicio = bisect_left(tarefas, ordinal, key=_chave)
+    fim = bisect_right(tarefas, ordinal, lo=inicio, key=_chave)
+    return tarefas[inicio:fim]
@@ -0,0 +1,57 @@
+from bisect import bisect_left, insort
+
+
+class IndiceLembretes:
+    """Índice dos jobs agendados, separado por chat.
+
+    Evita varrer `job_queue.jobs()` (os lembretes de todos os usuários) a
+    cada /meuslembretes ou /cancelar: cada operação só toca nos lembretes
+    do próprio chat. Para cada chat guardamos:
+
+    - um dicionário nome do job → job;
+    - a lista ordenada dos nomes, para achar por prefixo com bisect.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._nomes = {}
+
+    def adicionar(self, chat_id: int, job) -> None:
+        jobs = self._jobs.setdefault(chat_id, {})
+        novo = job.name not in jobs
+        # Série recorrente reagendada: troca o job e mantém a posição na lista
+        jobs[job.name] = job
+        if novo:
+            insort(self._nomes.setdefault(chat_id, []), job.name)
+
+    def remover(self, chat_id: int, nome: str) -> None:
+        jobs = self._jobs.get(chat_id)
+        if not jobs or jobs.pop(nome, None) is None:
+            return
+        nomes = self._nomes[chat_id]
+        del nomes[bisect_left(nomes, nome)]
+        if not jobs:
+            # Não deixa chats sem lembretes ocupando memória
+            del self._jobs[chat_id]
+            del self._nomes[chat_id]
+
+    def listar(self, chat_id: int) -> list:
+        """Jobs do chat do próximo disparo ao mais distante, como em `job_queue.jobs()`."""
+        # next_t é None para jobs que já saíram do agendador; vão para o fim
+        return sorted(
+            self._jobs.get(chat_id, {}).values(),
+            key=lambda job: job.next_t.timestamp() if job.next_t else float('inf')
+        )
+
+    def buscar(self, chat_id: int, prefixo: str) -> list:
+        """Jobs do chat cujo nome começa com `prefixo`."""
+        nomes = self._nomes.get(chat_id)
+        if not nomes or not prefixo:
+            return []
+        jobs = self._jobs[chat_id]
+        encontrados = []
+        i = bisect_left(nomes, prefixo)
+        while i < len(nomes) and nomes[i].startswith(prefixo):
+            encontrados.append(jobs[nomes[i]])
+            i += 1
+        return encontrados
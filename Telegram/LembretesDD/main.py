@@ -1,9 +1,26 @@
-import os 
+import sys
+import time
 import uuid
 import logging
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv 
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes, JobQueue, PicklePersistence
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, ContextTypes, JobQueue
+from indice import IndiceLembretes
+from recorrencia import RegraInvalida, interpretar
+
+DIRETORIO = Path(__file__).resolve().parent
+
+# Permite importar o pacote compartilhado "comum" da raiz do repositório
+sys.path.insert(0, str(DIRETORIO.parents[1]))
+from comum.agenda_persistente import AgendaPersistente
+from comum.ambiente import ambiente_do_bot
+from comum.fila_envio import FilaEnvio
+from comum.execucao import executar
+from comum.paginacao import escapar_markdown_v2, montar_pagina, posicao_do_callback, resumir
+from comum.telegram_base import abrir_persistencia, construir_aplicacao
 
 # Configuração de logging
 logging.basicConfig(
@@ -11,14 +28,25 @@ logging.basicConfig(
     level=logging.INFO
 )
 
-# Carrega variáveis de ambiente
-load_dotenv()
-TOKEN = os.getenv("TELEGRAM_TOKEN")
+# Configurações do bot: LEMBRETES_<VARIAVEL>, o ambiente ou o .env desta pasta
+ambiente = ambiente_do_bot(DIRETORIO, "lembretes")
+TOKEN = ambiente.get("TELEGRAM_TOKEN")
+# Fuso usado nas regras de /repetir com dia e horário
+FUSO = ZoneInfo(ambiente.get("FUSO_HORARIO", "America/Sao_Paulo"))
 
-def escape_markdown(texto: str) -> str:
-    """Função mantida para outras partes do bot, mas não usada no start."""
-    escape_chars = r'_*[]()~`>#+-=|{}.!'
-    return ''.join(f'\\{char}' if char in escape_chars else char for char in texto)
+# Lembretes agendados de cada chat, mantido junto com o JobQueue
+indice = IndiceLembretes()
+
+# Lembretes gravados em disco para sobreviverem a reinícios.
+# POLITICA_ATRASO: enviar | descartar | janela (com TOLERANCIA_ATRASO em segundos)
+agenda = AgendaPersistente(
+    ambiente.get("AGENDA_DB", str(DIRETORIO / "agenda.db")),
+    politica_atraso=ambiente.get("POLITICA_ATRASO", "enviar"),
+    tolerancia=float(ambiente.get("TOLERANCIA_ATRASO", "3600"))
+)
+
+# Envio dos lembretes respeitando os limites do Telegram
+fila_envio = FilaEnvio(trabalhadores=int(ambiente.get("TRABALHADORES_ENVIO", "4")))
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Envia uma mensagem de boas-vindas com texto simples para garantir o funcionamento."""
@@ -35,9 +63,19 @@ Exemplo: /lembrete 10m Ligar para a reunião
 Use o comando: /meuslembretes
 Isso listará todos os lembretes agendados.
 
-3. Cancelar um Lembrete
+3. Criar um Lembrete Recorrente
+Use o comando: /repetir <regra> | <mensagem>
+Exemplos:
+/repetir 30m | Beber água
+/repetir uteis 08:00 | Bater o ponto
+/repetir seg,qua,sex 18:30 | Academia
+/repetir cron 0 9 1 * * | Pagar as contas
+(Regras: a cada N m/h/d, diario, uteis ou dias da semana com HH:MM, ou cron com 5 campos)
+
+4. Cancelar um Lembrete
 Use o comando: /cancelar <ID>
 Exemplo: /cancelar a3f7b
+(Também cancela todas as próximas repetições de um lembrete recorrente)
 
 Comece criando seu primeiro lembrete!"""
     
@@ -46,8 +84,11 @@ Comece criando seu primeiro lembrete!"""
 async def enviar_lembrete(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Envia a mensagem de lembrete formatada."""
     job = context.job
-    mensagem_escapada = escape_markdown(job.data)
-    await context.bot.send_message(job.chat_id, text=f"🔔 Lembrete: *{mensagem_escapada}*", parse_mode='MarkdownV2')
+    # O job já disparou: sai do índice do chat
+    indice.remover(job.chat_id, job.name)
+    mensagem_escapada = escapar_markdown_v2(job.data)
+    # Aguarda a entrega: só então a agenda apaga o lembrete do disco
+    await fila_envio.enviar(job.chat_id, f"🔔 Lembrete: *{mensagem_escapada}*", parse_mode='MarkdownV2')
 
 async def lembrete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Agenda um novo lembrete."""
@@ -83,37 +124,121 @@ async def lembrete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     chat_id = update.effective_message.chat_id
     job_name = str(uuid.uuid4())
     
-    context.job_queue.run_once(
+    job = agenda.agendar(
+        context.job_queue,
         enviar_lembrete,
         delay,
         chat_id=chat_id,
-        data=mensagem,
-        name=job_name
+        dados=mensagem,
+        nome=job_name
     )
+    indice.adicionar(chat_id, job)
     
     # CORREÇÃO: Adicionado '\' antes de '!' para escapar o caractere especial.
-    await update.message.reply_text(rf"✅ Ok\! Lembrete agendado para daqui a `{escape_markdown(tempo_str)}`\.", parse_mode='MarkdownV2')
+    await update.message.reply_text(rf"✅ Ok\! Lembrete agendado para daqui a `{escapar_markdown_v2(tempo_str)}`\.", parse_mode='MarkdownV2')
 
-async def meus_lembretes(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Mostra ao usuário todos os lembretes agendados."""
-    tarefas_agendadas = context.job_queue.jobs()
-    tarefas_do_usuario = [job for job in tarefas_agendadas if job.chat_id == update.effective_chat.id]
+def _proxima_repeticao(dados: dict) -> tuple:
+    """Horário e dados do próximo disparo de uma série, a partir de agora."""
+    prevista = interpretar(dados['regra'], FUSO, validar=False).proxima(dados['prevista'], time.time())
+    return prevista, {**dados, 'prevista': prevista}
 
-    if not tarefas_do_usuario:
-        await update.message.reply_text("Você não tem nenhum lembrete agendado.")
+async def enviar_repeticao(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Envia um lembrete recorrente e reagenda o mesmo job para a próxima vez."""
+    job = context.job
+    mensagem_escapada = escapar_markdown_v2(job.data['mensagem'])
+    # Se o bot desligar antes da entrega, a linha continua nesta ocorrência
+    # e ela é reenviada no próximo início
+    entregue = await fila_envio.enviar(job.chat_id, f"🔁 Lembrete: *{mensagem_escapada}*", parse_mode='MarkdownV2')
+
+    if not entregue:
+        # Chat bloqueado, apagado ou falha definitiva: não adianta repetir para sempre
+        logging.warning("Série %s encerrada: o lembrete não pôde ser entregue ao chat %s.", job.name, job.chat_id)
+        indice.remover(job.chat_id, job.name)
+        agenda.remover(job.name)
         return
-        
+    if not indice.buscar(job.chat_id, job.name):
+        # Cancelado com /cancelar enquanto a mensagem estava na fila
+        return
+    prevista, dados = _proxima_repeticao(job.data)
+    proximo = agenda.agendar(
+        context.job_queue,
+        enviar_repeticao,
+        datetime.fromtimestamp(prevista, FUSO),
+        chat_id=job.chat_id,
+        dados=dados,
+        nome=job.name
+    )
+    indice.adicionar(job.chat_id, proximo)
+
+async def repetir(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Agenda uma série de lembretes a partir de uma regra de repetição."""
+    regra_texto, separador, mensagem = " ".join(context.args).partition("|")
+    regra_texto, mensagem = regra_texto.strip(), mensagem.strip()
+    if not separador or not regra_texto or not mensagem:
+        await update.message.reply_text("Uso incorreto! Tente: /repetir <regra> | <mensagem>\nEx: /repetir seg,qua,sex 18:30 | Academia")
+        return
+
+    try:
+        regra = interpretar(regra_texto, FUSO)
+    except RegraInvalida as e:
+        await update.message.reply_text(f"Regra inválida: {e}")
+        return
+
+    agora = time.time()
+    prevista = regra.proxima(agora, agora)
+    chat_id = update.effective_message.chat_id
+    job = agenda.agendar(
+        context.job_queue,
+        enviar_repeticao,
+        datetime.fromtimestamp(prevista, FUSO),
+        chat_id=chat_id,
+        dados={'regra': regra.texto, 'descricao': regra.descricao(), 'mensagem': mensagem, 'prevista': prevista},
+        nome=str(uuid.uuid4())
+    )
+    indice.adicionar(chat_id, job)
+
+    quando = datetime.fromtimestamp(prevista, FUSO).strftime("%d/%m/%Y %H:%M")
+    await update.message.reply_text(f"✅ Ok! Lembrete recorrente ({regra.descricao()}) criado. Próximo envio: {quando}.")
+
+def _linha_lembrete(posicao: int, job) -> str:
+    id_curto = job.name.split('-')[0]
+    if isinstance(job.data, dict):
+        # A descrição é gravada na criação; a lista não precisa reinterpretar a regra
+        descricao = job.data.get('descricao') or interpretar(job.data['regra'], FUSO, validar=False).descricao()
+        return f"ID: {id_curto} - 🔁 {descricao} - Lembrete: {resumir(job.data['mensagem'])}\n"
+    return f"ID: {id_curto} - Lembrete: {resumir(job.data)}\n"
+
+def pagina_de_lembretes(lembretes: list, inicio: int = 0) -> tuple:
+    """Texto e botões da página de /meuslembretes que começa em `inicio`."""
     # MUDANÇA: Simplificado para texto puro para evitar erros de markdown na lista.
-    texto_lista = "Seus lembretes agendados:\n\n"
-    for job in tarefas_do_usuario:
-        mensagem_lembrete = job.data
-        id_curto = job.name.split('-')[0]
-        
-        texto_lista += f"ID: {id_curto} - Lembrete: {mensagem_lembrete}\n"
-        
-    texto_lista += "\nPara cancelar, use /cancelar <ID>."
-    
-    await update.message.reply_text(texto_lista)
+    return montar_pagina(
+        lembretes, inicio, _linha_lembrete,
+        cabecalho="Seus lembretes agendados:\n\n",
+        rodape="\nPara cancelar, use /cancelar <ID>.",
+        prefixo="lembretes"
+    )
+
+async def meus_lembretes(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Mostra ao usuário a primeira página dos lembretes agendados."""
+    lembretes = indice.listar(update.effective_chat.id)
+    if not lembretes:
+        await update.message.reply_text("Você não tem nenhum lembrete agendado.")
+        return
+
+    texto, teclado = pagina_de_lembretes(lembretes)
+    await update.message.reply_text(texto, reply_markup=teclado)
+
+async def mudar_pagina_lembretes(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Botões ◀/▶ da lista: renderiza só a página pedida."""
+    consulta = update.callback_query
+    await consulta.answer()
+    lembretes = indice.listar(consulta.message.chat_id)
+    if not lembretes:
+        await consulta.edit_message_text("Você não tem nenhum lembrete agendado.")
+        return
+
+    texto, teclado = pagina_de_lembretes(lembretes, posicao_do_callback(consulta.data))
+    await consulta.edit_message_text(texto, reply_markup=teclado)
 
 async def cancelar_lembrete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Cancela um lembrete agendado."""
@@ -123,7 +248,8 @@ async def cancelar_lembrete(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await update.message.reply_text("Uso incorreto. Envie o ID do lembrete. Ex: /cancelar a3f7b")
         return
         
-    tarefas_encontradas = [job for job in context.job_queue.jobs() if job.name.startswith(id_para_cancelar) and job.chat_id == update.effective_chat.id]
+    chat_id = update.effective_chat.id
+    tarefas_encontradas = indice.buscar(chat_id, id_para_cancelar)
     
     if not tarefas_encontradas:
         await update.message.reply_text("Não encontrei nenhum lembrete com esse ID.")
@@ -131,31 +257,50 @@ async def cancelar_lembrete(update: Update, context: ContextTypes.DEFAULT_TYPE)
         
     for job in tarefas_encontradas:
         job.schedule_removal()
+        indice.remover(chat_id, job.name)
+        agenda.remover(job.name)
         
     await update.message.reply_text(f"✅ Lembrete com ID {id_para_cancelar} foi cancelado.")
 
-def main() -> None:
-    """Inicia o bot e o mantém rodando."""
-    if not TOKEN:
-        logging.error("O token do Telegram não foi encontrado! Verifique seu arquivo .env")
-        return
+async def restaurar_lembretes(application: Application) -> None:
+    """Recria no JobQueue os lembretes que estavam pendentes antes do reinício."""
+    for job in agenda.restaurar(application.job_queue):
+        indice.adicionar(job.chat_id, job)
 
-    persistence = PicklePersistence(filepath="bot_persistence")
+def criar_aplicacao(token: str, persistencia=None, request=None) -> Application:
+    """Monta o bot com todos os handlers, sem iniciá-lo.
 
-    application = (
-        Application.builder()
-        .token(TOKEN)
-        .persistence(persistence)
-        .build()
+    `persistencia` e `request` permitem trocar o armazenamento e o
+    transporte do Telegram (usado pelos benchmarks).
+    """
+    agenda.registrar(enviar_lembrete)
+    agenda.registrar(enviar_repeticao, proxima=_proxima_repeticao)
+    application = construir_aplicacao(
+        token, "lembretes", persistencia or abrir_persistencia(DIRETORIO, "lembretes"), fila_envio,
+        ao_iniciar=restaurar_lembretes, request=request
     )
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("lembrete", lembrete)) 
+    application.add_handler(CommandHandler("repetir", repetir))
     application.add_handler(CommandHandler("meuslembretes", meus_lembretes))
     application.add_handler(CommandHandler("cancelar", cancelar_lembrete))
+    application.add_handler(CallbackQueryHandler(mudar_pagina_lembretes, pattern=r"^lembretes:\d+$"))
+    return application
+
+def main() -> None:
+    """Inicia o bot e o mantém rodando."""
+    # Sozinho, as configurações gerais (MODO_ATUALIZACAO, WEBHOOK_*, METRICAS_PORTA) também vêm do .env
+    load_dotenv(DIRETORIO / ".env")
+    if not TOKEN:
+        logging.error("O token do Telegram não foi encontrado! Verifique seu arquivo .env")
+        return
+
+    application = criar_aplicacao(TOKEN)
 
     print("Bot iniciado... Pressione Ctrl+C para parar.")
-    application.run_polling()
+    # Polling por padrão; MODO_ATUALIZACAO=webhook usa o servidor embutido
+    executar(application)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,188 @@
+"""Regras de repetição dos lembretes recorrentes.
+
+Formatos aceitos (dias e horários no fuso de FUSO_HORARIO):
+
+    30m, 2h, 1d            a cada N minutos, horas ou dias
+    diario 09:00           todo dia às 09:00
+    uteis 07:30            de segunda a sexta
+    seg,qua,sex 18:00      nos dias da semana listados
+    cron 0 9 * * 1-5       expressão cron (minuto hora dia mês dia-da-semana)
+
+Uma regra não guarda estado: `proxima` calcula o próximo disparo a partir
+do último horário previsto, então cada série precisa de um único job.
+"""
+import math
+import re
+import unicodedata
+from datetime import datetime, timedelta
+
+# Uma série não pode disparar mais de uma vez por minuto
+INTERVALO_MINIMO = 60
+# Procura o próximo disparo até 4 anos à frente (cobre 29/02)
+DIAS_BUSCA = 4 * 366
+
+_UNIDADES = {'m': 60, 'h': 3600, 'd': 86400}
+_DIAS_SEMANA = {'seg': 0, 'ter': 1, 'qua': 2, 'qui': 3, 'sex': 4, 'sab': 5, 'dom': 6}
+_NOMES_DIAS = ['seg', 'ter', 'qua', 'qui', 'sex', 'sáb', 'dom']
+
+
+class RegraInvalida(ValueError):
+    """O texto não é uma regra de repetição válida."""
+
+
+class Intervalo:
+    def __init__(self, texto: str, segundos: int):
+        self.texto = texto
+        self.segundos = segundos
+
+    def proxima(self, referencia: float, agora: float) -> float:
+        """Mantém o passo a partir do horário previsto (sem acumular atraso)."""
+        passos = max(1, math.floor((agora - referencia) / self.segundos) + 1)
+        return referencia + passos * self.segundos
+
+    def descricao(self) -> str:
+        for unidade, nome in (('d', 'dia(s)'), ('h', 'hora(s)'), ('m', 'minuto(s)')):
+            if self.segundos % _UNIDADES[unidade] == 0:
+                return f"a cada {self.segundos // _UNIDADES[unidade]} {nome}"
+
+
+class Calendario:
+    """Regra no estilo cron: conjuntos de minutos, horas, dias, meses e dias da semana."""
+
+    def __init__(self, texto: str, fuso, minutos, horas, dias=None, meses=None, dias_semana=None):
+        self.texto = texto
+        self.fuso = fuso
+        self.minutos = sorted(minutos)
+        self.horas = sorted(horas)
+        # None = qualquer valor ("*")
+        self.dias = dias
+        self.meses = meses
+        self.dias_semana = dias_semana    # 0 = segunda, como em date.weekday()
+
+    def _dia_valido(self, dia) -> bool:
+        if self.meses is not None and dia.month not in self.meses:
+            return False
+        if self.dias is not None and self.dias_semana is not None:
+            # Como no cron: com os dois restritos, basta um deles bater
+            return dia.day in self.dias or dia.weekday() in self.dias_semana
+        if self.dias is not None:
+            return dia.day in self.dias
+        if self.dias_semana is not None:
+            return dia.weekday() in self.dias_semana
+        return True
+
+    def proxima(self, referencia: float, agora: float) -> float:
+        depois = datetime.fromtimestamp(max(referencia, agora), self.fuso)
+        inicio = (depois + timedelta(minutes=1)).replace(second=0, microsecond=0)
+        dia = inicio.date()
+        for _ in range(DIAS_BUSCA):
+            if self._dia_valido(dia):
+                mesmo_dia = dia == inicio.date()
+                for hora in self.horas:
+                    if mesmo_dia and hora < inicio.hour:
+                        continue
+                    for minuto in self.minutos:
+                        if mesmo_dia and hora == inicio.hour and minuto < inicio.minute:
+                            continue
+                        return datetime(dia.year, dia.month, dia.day, hora, minuto, tzinfo=self.fuso).timestamp()
+            dia += timedelta(days=1)
+        raise RegraInvalida(f"'{self.texto}' nunca dispara")
+
+    def descricao(self) -> str:
+        if self.texto.startswith('cron '):
+            return self.texto
+        horario = f"{self.horas[0]:02d}:{self.minutos[0]:02d}"
+        if self.dias_semana is None:
+            return f"todo dia às {horario}"
+        return f"{','.join(_NOMES_DIAS[d] for d in sorted(self.dias_semana))} às {horario}"
+
+
+def _sem_acentos(texto: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+
+def _campo_cron(campo: str, minimo: int, maximo: int, nome: str) -> set:
+    valores = set()
+    for parte in campo.split(','):
+        faixa, barra, passo = parte.partition('/')
+        try:
+            passo = int(passo) if barra else 1
+            if faixa == '*':
+                inicio, fim = minimo, maximo
+            elif '-' in faixa:
+                inicio, fim = (int(v) for v in faixa.split('-', 1))
+            elif barra:
+                # Como no cron: "5/10" vai de 5 até o fim do campo, de 10 em 10
+                inicio, fim = int(faixa), maximo
+            else:
+                inicio = fim = int(faixa)
+        except ValueError:
+            raise RegraInvalida(f"campo '{nome}' inválido: {campo}") from None
+        if passo < 1 or not (minimo <= inicio <= fim <= maximo):
+            raise RegraInvalida(f"campo '{nome}' fora do intervalo {minimo}-{maximo}: {campo}")
+        valores.update(range(inicio, fim + 1, passo))
+    return valores
+
+
+def _cron(texto: str, expressao: str, fuso) -> Calendario:
+    campos = expressao.split()
+    if len(campos) != 5:
+        raise RegraInvalida("a expressão cron precisa de 5 campos: minuto hora dia mês dia-da-semana")
+    minutos = _campo_cron(campos[0], 0, 59, 'minuto')
+    horas = _campo_cron(campos[1], 0, 23, 'hora')
+    dias = None if campos[2] == '*' else _campo_cron(campos[2], 1, 31, 'dia')
+    meses = None if campos[3] == '*' else _campo_cron(campos[3], 1, 12, 'mês')
+    dias_semana = None
+    if campos[4] != '*':
+        # No cron 0 e 7 são domingo; no Python domingo é 6
+        dias_semana = {(d - 1) % 7 for d in _campo_cron(campos[4], 0, 7, 'dia da semana')}
+    return Calendario(texto, fuso, minutos, horas, dias, meses, dias_semana)
+
+
+def _horario(texto: str) -> tuple:
+    encontrado = re.fullmatch(r'(\d{1,2})[:h](\d{2})', texto)
+    if not encontrado or int(encontrado.group(1)) > 23 or int(encontrado.group(2)) > 59:
+        raise RegraInvalida(f"horário inválido: {texto} (use HH:MM)")
+    return int(encontrado.group(1)), int(encontrado.group(2))
+
+
+def interpretar(texto: str, fuso, validar: bool = True):
+    """Converte o texto da regra em Intervalo ou Calendario.
+
+    Com `validar`, confere também se a regra dispara alguma vez (para
+    cron, uma busca de até DIAS_BUSCA dias); regras já gravadas não
+    precisam disso.
+    """
+    texto = ' '.join(texto.split())
+    normalizado = _sem_acentos(texto).casefold()
+
+    encontrado = re.fullmatch(r'(\d+)\s*([mhd])', normalizado)
+    if encontrado:
+        segundos = int(encontrado.group(1)) * _UNIDADES[encontrado.group(2)]
+        if segundos < INTERVALO_MINIMO:
+            raise RegraInvalida("o intervalo mínimo é de 1 minuto")
+        return Intervalo(normalizado, segundos)
+
+    if normalizado.startswith('cron '):
+        regra = _cron(normalizado, normalizado[5:], fuso)
+    else:
+        partes = normalizado.split(' ')
+        if len(partes) != 2:
+            raise RegraInvalida(f"regra não reconhecida: {texto}")
+        dias_texto, horario = partes
+        hora, minuto = _horario(horario)
+        if dias_texto in ('diario', 'todo-dia'):
+            dias_semana = None
+        elif dias_texto in ('uteis', 'dias-uteis'):
+            dias_semana = {0, 1, 2, 3, 4}
+        else:
+            try:
+                dias_semana = {_DIAS_SEMANA[d[:3]] for d in dias_texto.split(',')}
+            except KeyError:
+                raise RegraInvalida(f"dias da semana inválidos: {dias_texto} (use seg,ter,qua,qui,sex,sab,dom)") from None
+        regra = Calendario(normalizado, fuso, {minuto}, {hora}, dias_semana=dias_semana)
+
+    if validar:
+        # Recusa já na criação regras que nunca disparam (ex.: 31 de fevereiro)
+        regra.proxima(0, datetime.now().timestamp())
+    return regra
@@ -0,0 +1,50 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from recorrencia import RegraInvalida, interpretar
+
+FUSO = ZoneInfo("America/Sao_Paulo")
+
+
+def _instante(*campos) -> float:
+    return datetime(*campos, tzinfo=FUSO).timestamp()
+
+
+def test_cron_valor_com_passo_vai_ate_o_fim_do_campo():
+    regra = interpretar("cron 5/10 * * * *", FUSO)
+    assert regra.minutos == [5, 15, 25, 35, 45, 55]
+
+
+def test_cron_faixa_e_asterisco_com_passo():
+    assert interpretar("cron 10-30/10 * * * *", FUSO).minutos == [10, 20, 30]
+    assert interpretar("cron */15 * * * *", FUSO).minutos == [0, 15, 30, 45]
+    assert interpretar("cron 7 * * * *", FUSO).minutos == [7]
+
+
+def test_proxima_com_passo():
+    regra = interpretar("cron 5/10 * * * *", FUSO)
+    agora = _instante(2026, 3, 2, 9, 16)
+    assert regra.proxima(agora, agora) == _instante(2026, 3, 2, 9, 25)
+    agora = _instante(2026, 3, 2, 9, 56)
+    assert regra.proxima(agora, agora) == _instante(2026, 3, 2, 10, 5)
+
+
+def test_proxima_uteis_pula_o_fim_de_semana():
+    regra = interpretar("uteis 08:00", FUSO)
+    sexta = _instante(2026, 3, 6, 9, 0)
+    assert regra.proxima(sexta, sexta) == _instante(2026, 3, 9, 8, 0)
+
+
+def test_intervalo_nao_acumula_atraso():
+    regra = interpretar("30m", FUSO)
+    prevista = _instante(2026, 3, 2, 9, 0)
+    # Disparou 5 minutos atrasado: a próxima continua em 9:30
+    assert regra.proxima(prevista, prevista + 300) == prevista + 1800
+
+
+@pytest.mark.parametrize("texto", ["cron 0 9 31 2 *", "cron 60 * * * *", "cron 0/0 * * * *", "10s", "toda hora"])
+def test_regras_invalidas(texto):
+    with pytest.raises(RegraInvalida):
+        interpretar(texto, FUSO)
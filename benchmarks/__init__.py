@@ -0,0 +1 @@
+"""Benchmarks offline dos handlers dos bots (veja benchmarks/executar.py)."""
@@ -0,0 +1,81 @@
+"""Servidor local que imita o OpenWeatherMap e o Frankfurter.
+
+Responde qualquer cidade com dados fixos (o id é derivado do nome) e uma
+tabela de cotações fixa, sempre depois de `latencia` segundos, para que o
+tempo medido nos benchmarks seja o do bot e não o da internet.
+"""
+import asyncio
+import socket
+import zlib
+from datetime import date
+
+from aiohttp import web
+
+TAXAS = {
+    'USD': 1.08, 'BRL': 5.9, 'GBP': 0.85, 'JPY': 161.2, 'ARS': 990.0,
+    'CHF': 0.95, 'CAD': 1.47, 'AUD': 1.63, 'CNY': 7.8, 'MXN': 19.7,
+}
+
+
+def _clima(id_cidade: int, nome: str) -> dict:
+    return {
+        'id': id_cidade,
+        'name': nome,
+        'main': {'temp': 298.15, 'feels_like': 299.0, 'humidity': 70},
+        'weather': [{'description': 'céu limpo', 'icon': '01d'}],
+        'wind': {'speed': 3.5},
+    }
+
+
+class APIsFalsas:
+    def __init__(self, latencia: float = 0.0):
+        self.latencia = latencia
+        self.requisicoes = 0
+        self._nomes = {}     # id → nome, para responder o /group
+        self._runner = None
+        self.url = None
+
+    async def _esperar(self) -> None:
+        self.requisicoes += 1
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+
+    async def _weather(self, request: web.Request) -> web.Response:
+        await self._esperar()
+        nome = request.query.get('q', '').strip()
+        if not nome:
+            return web.json_response({'cod': '404', 'message': 'city not found'}, status=404)
+        id_cidade = zlib.crc32(nome.casefold().encode())
+        self._nomes[id_cidade] = nome
+        return web.json_response(_clima(id_cidade, nome))
+
+    async def _group(self, request: web.Request) -> web.Response:
+        await self._esperar()
+        ids = [int(i) for i in request.query.get('id', '').split(',') if i]
+        lista = [_clima(i, self._nomes.get(i, str(i))) for i in ids]
+        return web.json_response({'cnt': len(lista), 'list': lista})
+
+    async def _latest(self, request: web.Request) -> web.Response:
+        await self._esperar()
+        return web.json_response({
+            'amount': 1.0, 'base': 'EUR', 'date': date.today().isoformat(), 'rates': TAXAS
+        })
+
+    async def iniciar(self) -> str:
+        """Sobe o servidor numa porta livre e devolve a URL base."""
+        app = web.Application()
+        app.router.add_get('/data/2.5/weather', self._weather)
+        app.router.add_get('/data/2.5/group', self._group)
+        app.router.add_get('/latest', self._latest)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        # Porta escolhida pelo sistema para não colidir com nada
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        await web.SockSite(self._runner, sock).start()
+        self.url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        return self.url
+
+    async def parar(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,55 @@
+"""Interações falsas para chamar os slash commands do nextcord diretamente.
+
+Guardam o instante da primeira resposta (defer ou mensagem) para separar
+o tempo até o defer do tempo total do comando.
+"""
+import time
+
+
+class _Usuario:
+    def __init__(self, id: int):
+        self.id = id
+        self.mention = f"<@{id}>"
+
+
+class _Resposta:
+    def __init__(self, interacao):
+        self._interacao = interacao
+
+    def is_done(self) -> bool:
+        return self._interacao.respondida_em is not None
+
+    async def defer(self, *args, **kwargs) -> None:
+        self._interacao._registrar()
+
+    async def send_message(self, content=None, **kwargs) -> None:
+        self._interacao._registrar(content, **kwargs)
+
+
+class _Followup:
+    def __init__(self, interacao):
+        self._interacao = interacao
+
+    async def send(self, content=None, **kwargs) -> None:
+        self._interacao._registrar(content, **kwargs)
+
+
+class InteracaoFalsa:
+    def __init__(self, usuario_id: int, canal_id: int):
+        self.user = _Usuario(usuario_id)
+        self.channel_id = canal_id
+        self.guild_id = None
+        self.response = _Resposta(self)
+        self.followup = _Followup(self)
+        self.criada_em = time.perf_counter()
+        self.respondida_em = None
+        self.mensagens = []
+
+    def _registrar(self, content=None, **kwargs) -> None:
+        if self.respondida_em is None:
+            self.respondida_em = time.perf_counter()
+        if content is not None or kwargs:
+            self.mensagens.append((content, kwargs))
+
+    async def send(self, content=None, **kwargs) -> None:
+        self._registrar(content, **kwargs)
@@ -0,0 +1,328 @@
+"""Benchmarks offline dos handlers dos bots.
+
+Roda os handlers reais com Updates/Interactions sintéticos, um Telegram
+falso que só conta os envios e APIs de clima/cotação locais com latência
+configurável. Nada sai da máquina e nenhum dado dos bots é tocado: bancos
+e persistência ficam numa pasta temporária.
+
+    python -m benchmarks.executar
+    python -m benchmarks.executar --usuarios 5000 --itens 10 --latencia 0.05
+    python -m benchmarks.executar --bots discord --comparar a94e72c
+
+Para cada cenário mostra vazão (operações/s), latência p50/p99, no Discord
+também o tempo até o defer, e a memória (tracemalloc) retida e de pico. O
+resultado é salvo em benchmarks/resultados/<commit>.json; --comparar mostra
+a diferença para o resultado de outro commit (ou arquivo).
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+RESULTADOS = Path(__file__).resolve().parent / 'resultados'
+
+sys.path.insert(0, str(RAIZ))
+from benchmarks.apis_falsas import APIsFalsas
+
+TOKEN_FALSO = "123456:BENCHMARK"
+
+
+# --- Medição ---
+
+def _percentil(valores: list, p: int) -> float:
+    if len(valores) < 2:
+        return valores[0] if valores else 0.0
+    return statistics.quantiles(valores, n=100, method='inclusive')[p - 1]
+
+
+async def medir(nome: str, chamadas: list, concorrencia: int) -> dict:
+    """Executa as chamadas com no máximo `concorrencia` simultâneas.
+
+    Cada item é (função sem argumentos que devolve um awaitable, interação
+    falsa ou None).
+    """
+    latencias, ate_resposta, erros = [], [], 0
+    semaforo = asyncio.Semaphore(concorrencia)
+
+    async def executar(funcao, interacao):
+        nonlocal erros
+        async with semaforo:
+            inicio = time.perf_counter()
+            try:
+                await funcao()
+            except Exception as e:
+                erros += 1
+                logging.debug(f"Erro em {nome}: {e}")
+            fim = time.perf_counter()
+            latencias.append(fim - inicio)
+            if interacao is not None and interacao.respondida_em is not None:
+                ate_resposta.append(interacao.respondida_em - inicio)
+
+    medir_memoria = tracemalloc.is_tracing()
+    if medir_memoria:
+        tracemalloc.reset_peak()
+        memoria_antes = tracemalloc.get_traced_memory()[0]
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(executar(funcao, interacao) for funcao, interacao in chamadas))
+    duracao = time.perf_counter() - inicio
+
+    resultado = {
+        'operacoes': len(chamadas),
+        'erros': erros,
+        'vazao': len(chamadas) / duracao if duracao else 0.0,
+        'p50_ms': _percentil(latencias, 50) * 1000,
+        'p99_ms': _percentil(latencias, 99) * 1000,
+    }
+    if ate_resposta:
+        resultado['resposta_p50_ms'] = _percentil(ate_resposta, 50) * 1000
+        resultado['resposta_p99_ms'] = _percentil(ate_resposta, 99) * 1000
+    if medir_memoria:
+        atual, pico = tracemalloc.get_traced_memory()
+        resultado['memoria_retida_kb'] = (atual - memoria_antes) / 1024
+        resultado['memoria_pico_kb'] = (pico - memoria_antes) / 1024
+    return resultado
+
+
+# --- Cenários ---
+
+async def _iniciar_telegram(modulo, diretorio: Path):
+    from benchmarks.telegram_falso import GeradorUpdates, RequestFalso, iniciar
+    from comum.telegram_base import abrir_persistencia
+
+    diretorio.mkdir()
+    request = RequestFalso()
+    application = modulo.criar_aplicacao(
+        TOKEN_FALSO, persistencia=abrir_persistencia(diretorio), request=request
+    )
+    await iniciar(application)
+    return application, GeradorUpdates(application.bot)
+
+
+def _updates(application, gerador, comandos: list) -> list:
+    """Monta os Updates antes da medição; só o processamento entra no tempo."""
+    return [
+        (functools.partial(application.process_update, gerador.comando(usuario, texto)), None)
+        for usuario, texto in comandos
+    ]
+
+
+async def cenario_lembretes(modulo, args, temporario: Path) -> dict:
+    from benchmarks.telegram_falso import parar
+
+    application, gerador = await _iniciar_telegram(modulo, temporario / 'lembretes')
+    usuarios = range(1, args.usuarios + 1)
+    resultados = {}
+    try:
+        comandos = [(u, f"/lembrete {random.randint(1, 30)}d Lembrete {i} do usuário {u}")
+                    for i in range(args.itens) for u in usuarios]
+        resultados['lembrete'] = await medir('lembrete', _updates(application, gerador, comandos), args.concorrencia)
+
+        comandos = [(u, "/meuslembretes") for u in usuarios]
+        resultados['meus_lembretes'] = await medir('meus_lembretes', _updates(application, gerador, comandos), args.concorrencia)
+
+        comandos = [(u, f"/cancelar {modulo.indice.listar(u)[0].name.split('-')[0]}")
+                    for u in usuarios if modulo.indice.listar(u)]
+        resultados['cancelar_lembrete'] = await medir('cancelar_lembrete', _updates(application, gerador, comandos), args.concorrencia)
+    finally:
+        await parar(application)
+    return resultados
+
+
+async def cenario_checklist(modulo, args, temporario: Path) -> dict:
+    from benchmarks.telegram_falso import parar
+
+    application, gerador = await _iniciar_telegram(modulo, temporario / 'checklist')
+    usuarios = range(1, args.usuarios + 1)
+    hoje = date.today()
+    resultados = {}
+    try:
+        comandos = [(u, f"/criartarefa {hoje + timedelta(days=random.randint(0, 365)):%d/%m/%Y} - Tarefa {i}")
+                    for i in range(args.itens) for u in usuarios]
+        resultados['criar'] = await medir('criar', _updates(application, gerador, comandos), args.concorrencia)
+
+        comandos = [(u, "/listartarefas") for u in usuarios]
+        resultados['listar'] = await medir('listar', _updates(application, gerador, comandos), args.concorrencia)
+
+        comandos = [(u, "/deletartarefa 1") for u in usuarios]
+        resultados['deletar'] = await medir('deletar', _updates(application, gerador, comandos), args.concorrencia)
+    finally:
+        await parar(application)
+    return resultados
+
+
+async def cenario_discord(modulo, args, temporario: Path) -> dict:
+    from benchmarks.discord_falso import InteracaoFalsa
+
+    def chamadas(comando, argumentos: list) -> list:
+        itens = []
+        for usuario, kwargs in argumentos:
+            interacao = InteracaoFalsa(usuario, canal_id=1)
+            itens.append((functools.partial(comando.callback, interacao, **kwargs), interacao))
+        return itens
+
+    usuarios = range(1, args.usuarios + 1)
+    cidades = [f"Cidade {i}" for i in range(args.cidades)]
+    resultados = {}
+    try:
+        argumentos = [(u, {'cidades': ", ".join(random.sample(cidades, min(3, len(cidades))))}) for u in usuarios]
+        resultados['tempo'] = await medir('tempo', chamadas(modulo.tempo, argumentos), args.concorrencia)
+
+        argumentos = [(u, {}) for u in usuarios]
+        resultados['dolar'] = await medir('dolar', chamadas(modulo.dolar, argumentos), args.concorrencia)
+
+        argumentos = [(u, {'tempo': random.randint(1, 24), 'unidade': 'horas'}) for u in usuarios]
+        resultados['temporizador'] = await medir('temporizador', chamadas(modulo.temporizador, argumentos), args.concorrencia)
+    finally:
+        await modulo.motor_temporizadores.parar()
+    return resultados
+
+
+CENARIOS = {
+    'lembretes': cenario_lembretes,
+    'checklist': cenario_checklist,
+    'discord': cenario_discord,
+}
+
+
+# --- Resultados ---
+
+def _commit() -> str:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        sujo = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'sem-git'
+    return f"{commit}-modificado" if sujo else commit
+
+
+def _variacao(atual: dict, antes: dict, campo: str) -> float:
+    return (atual[campo] / antes[campo] - 1) * 100 if antes.get(campo) else float('nan')
+
+
+def imprimir(resultados: dict, anterior: dict = None) -> None:
+    cabecalho = f"{'cenário':<30}{'ops':>8}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'defer p99':>11}{'retida KB':>12}{'pico KB':>10}"
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    for nome, r in resultados.items():
+        print(
+            f"{nome:<30}{r['operacoes']:>8}{r['vazao']:>12.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+            f"{r.get('resposta_p99_ms', float('nan')):>11.2f}"
+            f"{r.get('memoria_retida_kb', float('nan')):>12.0f}{r.get('memoria_pico_kb', float('nan')):>10.0f}"
+        )
+        if r['erros']:
+            print(f"{'':<30}{r['erros']} erro(s)")
+        antes = (anterior or {}).get(nome)
+        if antes:
+            print(
+                f"{'  vs. anterior':<30}{'':>8}{_variacao(r, antes, 'vazao'):>+11.1f}%"
+                f"{_variacao(r, antes, 'p50_ms'):>+9.1f}%{_variacao(r, antes, 'p99_ms'):>+9.1f}%"
+            )
+
+
+def carregar_anterior(referencia: str) -> dict:
+    caminho = Path(referencia)
+    if not caminho.exists():
+        caminho = RESULTADOS / f"{referencia}.json"
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+# --- Execução ---
+
+async def executar(args) -> dict:
+    from comum.cliente_http import http
+    from comum.multibot import carregar_bot
+
+    apis = APIsFalsas(latencia=args.latencia)
+    url = await apis.iniciar()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix='benchmarks-') as pasta:
+        temporario = Path(pasta)
+        # Lido pelos módulos na importação: precisa vir antes de carregar os bots
+        os.environ.update({
+            'AGENDA_DB': str(temporario / 'agenda.db'),
+            'VENCIMENTOS_DB': str(temporario / 'vencimentos.db'),
+            'TEMPORIZADORES_DB': str(temporario / 'temporizadores.db'),
+            'OPENWEATHER_URL': f"{url}/data/2.5",
+            'OPENWEATHER_API_KEY': 'benchmark',
+            'FRANKFURTER_URL': url,
+        })
+        os.environ.pop('METRICAS_PORTA', None)
+
+        try:
+            for nome in args.bots:
+                modulo = carregar_bot(nome)
+                # Os bots ligam o logging em INFO; aqui só interessam avisos
+                logging.getLogger().setLevel(logging.WARNING)
+                for cenario, resultado in (await CENARIOS[nome](modulo, args, temporario)).items():
+                    resultados[f"{nome}.{cenario}"] = resultado
+        finally:
+            await http.fechar()
+            await apis.parar()
+
+    print(f"Requisições às APIs falsas: {apis.requisicoes}")
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks offline dos handlers dos bots.")
+    parser.add_argument('--bots', default=",".join(CENARIOS), help="cenários a rodar (padrão: todos)")
+    parser.add_argument('--usuarios', type=int, default=1000, help="usuários simulados")
+    parser.add_argument('--itens', type=int, default=5, help="lembretes/tarefas criados por usuário")
+    parser.add_argument('--cidades', type=int, default=200, help="cidades distintas pedidas no /tempo")
+    parser.add_argument('--concorrencia', type=int, default=100, help="comandos processados ao mesmo tempo")
+    parser.add_argument('--latencia', type=float, default=0.02, help="latência das APIs falsas, em segundos")
+    parser.add_argument('--sem-memoria', action='store_true', help="não usa o tracemalloc (latências mais fiéis)")
+    parser.add_argument('--comparar', help="commit ou arquivo de resultado para comparar")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    args.bots = [b.strip().lower() for b in args.bots.split(",") if b.strip()]
+    desconhecidos = [b for b in args.bots if b not in CENARIOS]
+    if desconhecidos:
+        parser.error(f"cenários desconhecidos: {', '.join(desconhecidos)}")
+    random.seed(args.semente)
+
+    anterior = carregar_anterior(args.comparar)['cenarios'] if args.comparar else None
+
+    if not args.sem_memoria:
+        tracemalloc.start()
+    resultados = asyncio.run(executar(args))
+    tracemalloc.stop()
+
+    imprimir(resultados, anterior)
+
+    commit = _commit()
+    RESULTADOS.mkdir(exist_ok=True)
+    caminho = RESULTADOS / f"{commit}.json"
+    parametros = {k: v for k, v in vars(args).items() if k != 'comparar'}
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({
+            'commit': commit,
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'parametros': parametros,
+            'cenarios': resultados,
+        }, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultado salvo em {caminho.relative_to(RAIZ)}")
+
+
+if __name__ == '__main__':
+    main()
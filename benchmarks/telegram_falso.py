@@ -0,0 +1,93 @@
+"""Transporte falso para o python-telegram-bot e Updates sintéticos.
+
+O RequestFalso responde as chamadas da Bot API sem sair da máquina e
+conta o que foi enviado, então os handlers rodam de verdade (JobQueue,
+persistência, fila de envio) sem falar com o Telegram.
+"""
+import json
+import time
+from collections import Counter
+
+from telegram import Update
+from telegram.request import BaseRequest
+
+BOT = {'id': 1, 'is_bot': True, 'first_name': 'Benchmark', 'username': 'benchmark_bot'}
+
+
+class RequestFalso(BaseRequest):
+    def __init__(self):
+        self.chamadas = Counter()
+        self._proxima_mensagem = 0
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url: str, method: str, request_data=None, **_) -> tuple:
+        metodo = url.rsplit('/', 1)[-1]
+        self.chamadas[metodo] += 1
+        parametros = request_data.parameters if request_data is not None else {}
+
+        if metodo == 'getMe':
+            resultado = BOT
+        elif metodo in ('sendMessage', 'sendDocument', 'editMessageText'):
+            self._proxima_mensagem += 1
+            chat_id = int(parametros.get('chat_id', 0))
+            resultado = {
+                'message_id': self._proxima_mensagem,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'group'},
+                'from': BOT,
+                'text': parametros.get('text', ''),
+            }
+        else:
+            resultado = True
+        return 200, json.dumps({'ok': True, 'result': resultado}).encode()
+
+
+class GeradorUpdates:
+    """Cria Updates de comandos como se viessem de chats privados."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._proximo = 0
+
+    def comando(self, usuario_id: int, texto: str) -> Update:
+        self._proximo += 1
+        comando = texto.split(' ', 1)[0]
+        usuario = {'id': usuario_id, 'is_bot': False, 'first_name': f'Usuário {usuario_id}'}
+        dados = {
+            'update_id': self._proximo,
+            'message': {
+                'message_id': self._proximo,
+                'date': int(time.time()),
+                'chat': {'id': usuario_id, 'type': 'private'},
+                'from': usuario,
+                'text': texto,
+                'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(comando)}],
+            },
+        }
+        return Update.de_json(dados, self.bot)
+
+
+async def iniciar(application) -> None:
+    """Mesmo ciclo de vida do run_polling, mas sem buscar updates."""
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+
+
+async def parar(application) -> None:
+    await application.stop()
+    if application.post_stop:
+        await application.post_stop(application)
+    await application.shutdown()
+    if application.post_shutdown:
+        await application.post_shutdown(application)
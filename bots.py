@@ -0,0 +1,8 @@
+"""Roda os bots habilitados em BOTS (lembretes, checklist, discord) em um só processo.
+
+    BOTS=lembretes,checklist python bots.py
+"""
+from comum.multibot import main
+
+if __name__ == '__main__':
+    main()
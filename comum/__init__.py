@@ -0,0 +1 @@
+"""Código compartilhado entre os bots do repositório."""
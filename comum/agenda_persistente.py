@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# O que fazer com lembretes que venceram enquanto o bot estava desligado
+ENVIAR = 'enviar'          # dispara todos assim que o bot volta
+DESCARTAR = 'descartar'    # apaga sem enviar
+JANELA = 'janela'          # dispara só os atrasados há no máximo `tolerancia` segundos
+POLITICAS = (ENVIAR, DESCARTAR, JANELA)
+
+
+class AgendaPersistente:
+    """Guarda em SQLite os jobs do JobQueue para que sobrevivam a reinícios.
+
+    Cada lembrete é gravado com o horário absoluto de disparo no momento em
+    que é agendado e apagado quando é entregue ou cancelado. Por isso o
+    callback só deve retornar depois da entrega (ex.: aguardando o future
+    da FilaEnvio). Ao iniciar,
+    `restaurar` recria todos os jobs pendentes de uma vez.
+
+    Como o JobQueue guarda a função e não o nome dela, os callbacks usados
+    precisam ser registrados com `registrar` antes de `restaurar`. Os dados
+    do job precisam ser serializáveis em JSON.
+
+    Séries recorrentes usam um único job: o callback chama `agendar` de novo
+    com o mesmo nome e um horário futuro, e a linha é mantida em vez de
+    apagada após o disparo.
+    """
+
+    def __init__(self, caminho_banco: str, politica_atraso: str = ENVIAR, tolerancia: float = 3600):
+        if politica_atraso not in POLITICAS:
+            raise ValueError(f"Política de atraso inválida: {politica_atraso!r}. Use uma de {POLITICAS}.")
+        self.politica_atraso = politica_atraso
+        self.tolerancia = tolerancia
+        self._callbacks = {}
+        self._proximas = {}
+
+        self._banco = sqlite3.connect(caminho_banco)
+        self._banco.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " nome TEXT PRIMARY KEY,"
+            " callback TEXT NOT NULL,"
+            " chat_id INTEGER,"
+            " dados TEXT,"
+            " executar_em REAL NOT NULL)"
+        )
+        self._banco.commit()
+
+    def registrar(self, callback, proxima=None) -> None:
+        """Permite que jobs deste callback sejam recriados após um reinício.
+
+        `proxima(dados) -> (executar_em, dados)` marca o callback como de uma
+        série recorrente: em vez de descartar um disparo atrasado pela
+        política, `restaurar` pula para a próxima ocorrência.
+        """
+        async def executar_e_apagar(context):
+            try:
+                await callback(context)
+            except asyncio.CancelledError:
+                # Interrompido antes da entrega (bot desligando): a linha fica
+                # para o job ser recriado no próximo início
+                raise
+            except Exception:
+                self._apagar_vencido(context.job.name)
+                raise
+            else:
+                self._apagar_vencido(context.job.name)
+
+        executar_e_apagar.__name__ = callback.__name__
+        self._callbacks[callback.__name__] = executar_e_apagar
+        if proxima is not None:
+            self._proximas[callback.__name__] = proxima
+
+    def agendar(self, job_queue, callback, quando, *, chat_id=None, dados=None, nome: str):
+        """Grava o job e o agenda no JobQueue.
+
+        `quando` pode ser um número de segundos a partir de agora ou um
+        datetime (sem fuso = horário local da máquina).
+        """
+        if callback.__name__ not in self._callbacks:
+            self.registrar(callback)
+
+        if isinstance(quando, datetime):
+            executar_em = quando.timestamp()
+        else:
+            executar_em = time.time() + quando
+
+        self._banco.execute(
+            "INSERT OR REPLACE INTO jobs (nome, callback, chat_id, dados, executar_em) VALUES (?, ?, ?, ?, ?)",
+            (nome, callback.__name__, chat_id, json.dumps(dados), executar_em)
+        )
+        self._banco.commit()
+        return self._criar_job(job_queue, callback.__name__, executar_em, chat_id, dados, nome)
+
+    def _apagar_vencido(self, nome: str) -> None:
+        # Entregue (ou com erro definitivo): não dispara de novo no próximo início.
+        # Se o callback reagendou o job para o futuro, a linha continua.
+        self._banco.execute("DELETE FROM jobs WHERE nome = ? AND executar_em <= ?", (nome, time.time()))
+        self._banco.commit()
+
+    def remover(self, nome: str) -> None:
+        self._banco.execute("DELETE FROM jobs WHERE nome = ?", (nome,))
+        self._banco.commit()
+
+    def restaurar(self, job_queue) -> list:
+        """Recria os jobs pendentes aplicando a política de atraso.
+
+        Devolve a lista de jobs recriados.
+        """
+        agora = time.time()
+        jobs, descartados, adiados = [], [], []
+        linhas = self._banco.execute("SELECT nome, callback, chat_id, dados, executar_em FROM jobs").fetchall()
+
+        for nome, nome_callback, chat_id, dados, executar_em in linhas:
+            if nome_callback not in self._callbacks:
+                logger.warning(f"Job {nome} ignorado: callback '{nome_callback}' não registrado.")
+                continue
+
+            dados = json.loads(dados)
+            atraso = agora - executar_em
+            if atraso > 0 and (
+                self.politica_atraso == DESCARTAR
+                or (self.politica_atraso == JANELA and atraso > self.tolerancia)
+            ):
+                proxima = self._proximas.get(nome_callback)
+                if proxima is None:
+                    descartados.append((nome,))
+                    continue
+                # Série recorrente: perde só a ocorrência atrasada
+                executar_em, dados = proxima(dados)
+                adiados.append((json.dumps(dados), executar_em, nome))
+
+            # Jobs atrasados (executar_em no passado) disparam imediatamente
+            jobs.append(self._criar_job(job_queue, nome_callback, executar_em, chat_id, dados, nome))
+
+        if descartados:
+            self._banco.executemany("DELETE FROM jobs WHERE nome = ?", descartados)
+        if adiados:
+            self._banco.executemany("UPDATE jobs SET dados = ?, executar_em = ? WHERE nome = ?", adiados)
+        self._banco.commit()
+
+        logger.info(
+            f"Agenda restaurada: {len(jobs)} job(s) recriado(s), {len(descartados)} descartado(s) "
+            f"e {len(adiados)} série(s) adiada(s) por atraso."
+        )
+        return jobs
+
+    def _criar_job(self, job_queue, nome_callback, executar_em, chat_id, dados, nome):
+        return job_queue.run_once(
+            self._callbacks[nome_callback],
+            # Em segundos a partir de agora, para não depender do fuso do JobQueue
+            max(executar_em - time.time(), 0),
+            chat_id=chat_id,
+            data=dados,
+            name=nome
+        )
+
+    def fechar(self) -> None:
+        self._banco.close()
@@ -0,0 +1,34 @@
+"""Configuração de cada bot, sem misturar o .env de um bot com o de outro.
+
+No runtime compartilhado (bots.py) todos os bots estão no mesmo processo,
+então um `load_dotenv()` de um bot colocaria no os.environ valores
+(FUSO_HORARIO, AGENDA_DB...) que os outros também leriam. Por isso os
+bots leem as próprias variáveis por aqui, nesta ordem:
+
+    1. <NOME>_<VARIAVEL> no ambiente (ex.: LEMBRETES_FUSO_HORARIO)
+    2. <VARIAVEL> no ambiente (vale para todos os bots do processo)
+    3. <VARIAVEL> no .env da pasta do bot
+"""
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+
+class Ambiente:
+    def __init__(self, diretorio: Path, nome: str):
+        self.prefixo = nome.upper()
+        self._arquivo = dotenv_values(Path(diretorio) / '.env')
+
+    def get(self, variavel: str, padrao: str = None) -> str:
+        for valor in (os.getenv(f"{self.prefixo}_{variavel}"), os.getenv(variavel), self._arquivo.get(variavel)):
+            if valor is not None:
+                return valor
+        return padrao
+
+
+@lru_cache(maxsize=None)
+def ambiente_do_bot(diretorio: Path, nome: str) -> Ambiente:
+    """Um Ambiente por bot; `nome` é o mesmo do BOTS do multibot (lembretes, checklist, discord)."""
+    return Ambiente(diretorio, nome)
@@ -0,0 +1,75 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from comum.metricas import HTTP_DURACAO, HTTP_ERROS
+
+# --- Configuração do pool de conexões ---
+
+LIMITE_CONEXOES = 100          # conexões simultâneas no total
+LIMITE_POR_HOST = 10           # conexões simultâneas para cada API
+KEEPALIVE_SEGUNDOS = 30        # quanto tempo uma conexão ociosa fica aberta
+TIMEOUT_TOTAL = 10             # mesmo limite que usávamos com o requests
+TIMEOUT_CONEXAO = 5
+
+
+class ClienteHTTP:
+    """Cliente HTTP assíncrono compartilhado pelos comandos do bot.
+
+    Mantém uma única ClientSession (e, portanto, um único pool de conexões
+    com keep-alive) para todas as chamadas às APIs externas. Assim os
+    comandos não bloqueiam o event loop e podem rodar em paralelo.
+    """
+
+    def __init__(self):
+        self._sessao = None
+        self._trava = asyncio.Lock()
+
+    async def _obter_sessao(self) -> aiohttp.ClientSession:
+        # A sessão precisa ser criada dentro do event loop, por isso é criada
+        # apenas no primeiro uso e não na importação do módulo.
+        if self._sessao is None or self._sessao.closed:
+            async with self._trava:
+                if self._sessao is None or self._sessao.closed:
+                    conector = aiohttp.TCPConnector(
+                        limit=LIMITE_CONEXOES,
+                        limit_per_host=LIMITE_POR_HOST,
+                        keepalive_timeout=KEEPALIVE_SEGUNDOS,
+                        ttl_dns_cache=300,
+                    )
+                    self._sessao = aiohttp.ClientSession(
+                        connector=conector,
+                        timeout=aiohttp.ClientTimeout(total=TIMEOUT_TOTAL, connect=TIMEOUT_CONEXAO),
+                        raise_for_status=True,
+                    )
+        return self._sessao
+
+    async def get_json(self, url: str, params: dict = None):
+        """Faz um GET e devolve o corpo já convertido de JSON.
+
+        Levanta aiohttp.ClientResponseError para respostas 4xx/5xx e
+        asyncio.TimeoutError se a API demorar demais.
+        """
+        sessao = await self._obter_sessao()
+        host = urlsplit(url).netloc
+        inicio = time.perf_counter()
+        try:
+            async with sessao.get(url, params=params) as resposta:
+                return await resposta.json()
+        except Exception:
+            HTTP_ERROS.inc(host)
+            raise
+        finally:
+            HTTP_DURACAO.observar(time.perf_counter() - inicio, host)
+
+    async def fechar(self) -> None:
+        """Fecha a sessão e libera as conexões do pool."""
+        if self._sessao is not None and not self._sessao.closed:
+            await self._sessao.close()
+        self._sessao = None
+
+
+# Instância única usada por todo o bot
+http = ClienteHTTP()
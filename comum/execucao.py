@@ -0,0 +1,146 @@
+"""Escolhe como o bot do Telegram recebe as atualizações.
+
+Variáveis de ambiente:
+    MODO_ATUALIZACAO            polling (padrão) ou webhook
+    ATUALIZACOES_CONCORRENTES   quantas atualizações processar em paralelo (padrão 1)
+    WEBHOOK_ESCUTAR             endereço do servidor embutido (padrão 0.0.0.0)
+    WEBHOOK_PORTA               porta do servidor embutido (padrão 8443)
+    WEBHOOK_CAMINHO             caminho do endpoint (padrão /telegram)
+    WEBHOOK_SEGREDO             obrigatório no modo webhook; o Telegram o envia
+                                no cabeçalho X-Telegram-Bot-Api-Secret-Token
+    WEBHOOK_URL                 URL pública (ex.: https://bot.exemplo.com). Se
+                                ausente, o webhook não é registrado no Telegram,
+                                o que permite testar localmente com:
+
+    curl -X POST -H "X-Telegram-Bot-Api-Secret-Token: $WEBHOOK_SEGREDO" \\
+         -H "Content-Type: application/json" -d @update.json \\
+         http://localhost:8443/telegram
+"""
+import asyncio
+import hmac
+import logging
+import os
+import signal
+
+from aiohttp import web
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+CABECALHO_SEGREDO = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+def atualizacoes_concorrentes():
+    """Valor para `Application.builder().concurrent_updates(...)`."""
+    quantidade = int(os.getenv("ATUALIZACOES_CONCORRENTES", "1"))
+    return quantidade if quantidade > 1 else False
+
+
+def modo_atualizacao():
+    """'polling' ou 'webhook', conforme MODO_ATUALIZACAO; None (com o erro no log) se for inválido."""
+    modo = os.getenv("MODO_ATUALIZACAO", "polling").lower()
+    if modo not in ("polling", "webhook"):
+        logger.critical(f"MODO_ATUALIZACAO inválido: {modo!r}. Use 'polling' ou 'webhook'.")
+        return None
+    return modo
+
+
+def configuracao_webhook():
+    """Parâmetros de `servir_webhook` lidos do ambiente; None (com o erro no log) sem o segredo."""
+    segredo = os.getenv("WEBHOOK_SEGREDO")
+    if not segredo:
+        logger.critical("WEBHOOK_SEGREDO é obrigatório no modo webhook.")
+        return None
+    return {
+        'segredo': segredo,
+        'escutar': os.getenv("WEBHOOK_ESCUTAR", "0.0.0.0"),
+        'porta': int(os.getenv("WEBHOOK_PORTA", "8443")),
+        'caminho': os.getenv("WEBHOOK_CAMINHO", "/telegram"),
+        'url_publica': os.getenv("WEBHOOK_URL"),
+    }
+
+
+def executar(application) -> None:
+    """Roda o bot em polling (padrão) ou webhook, conforme MODO_ATUALIZACAO."""
+    modo = modo_atualizacao()
+    if modo == "webhook":
+        configuracao = configuracao_webhook()
+        if configuracao is not None:
+            asyncio.run(servir_webhook(application, **configuracao))
+    elif modo == "polling":
+        application.run_polling()
+
+
+def criar_app_webhook(application, segredo: str, caminho: str) -> web.Application:
+    """Servidor HTTP que valida o segredo e repassa cada Update ao Application."""
+    app_web = web.Application()
+    adicionar_rota_webhook(app_web, application, segredo, caminho)
+    return app_web
+
+
+def adicionar_rota_webhook(app_web: web.Application, application, segredo: str, caminho: str) -> None:
+    """Recebe em `caminho` as atualizações de um bot (vários bots podem dividir o servidor)."""
+    async def receber(request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(CABECALHO_SEGREDO, ''), segredo):
+            return web.Response(status=403)
+        try:
+            dados = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        update = Update.de_json(dados, application.bot)
+        if update is None:
+            return web.Response(status=400)
+        # O processamento acontece no Application; o Telegram só precisa do 200
+        await application.update_queue.put(update)
+        return web.Response()
+
+    app_web.router.add_post(caminho, receber)
+
+
+async def registrar_webhook(application, url_publica: str, caminho: str, segredo: str) -> None:
+    await application.bot.set_webhook(
+        url=url_publica.rstrip('/') + caminho,
+        secret_token=segredo,
+        allowed_updates=Update.ALL_TYPES,
+    )
+
+
+async def iniciar_servidor_webhook(app_web: web.Application, escutar: str, porta: int) -> web.AppRunner:
+    executor = web.AppRunner(app_web)
+    await executor.setup()
+    await web.TCPSite(executor, escutar, porta).start()
+    return executor
+
+
+async def servir_webhook(application, segredo: str, escutar: str, porta: int, caminho: str, url_publica: str = None) -> None:
+    """Equivalente ao run_polling, mas recebendo as atualizações por HTTP."""
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, parar.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C cancela o asyncio.run e cai no finally
+            pass
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    if url_publica:
+        await registrar_webhook(application, url_publica, caminho, segredo)
+    await application.start()
+
+    executor = await iniciar_servidor_webhook(criar_app_webhook(application, segredo, caminho), escutar, porta)
+    logger.info(f"Webhook ouvindo em http://{escutar}:{porta}{caminho}")
+
+    try:
+        await parar.wait()
+    finally:
+        await executor.cleanup()
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
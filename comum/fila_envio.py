@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import timedelta
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Limites do Telegram para bots: ~30 mensagens/s no total, 1 mensagem/s por
+# chat privado e 20 mensagens/min por grupo.
+TAXA_GLOBAL = 30
+TAXA_CHAT_PRIVADO = 1
+TAXA_GRUPO = 20 / 60
+LIMITE_MENSAGEM = 4096
+TENTATIVAS_REDE = 3
+
+
+class BaldeDeFichas:
+    """Token bucket: `taxa` fichas por segundo, acumulando até `capacidade`."""
+
+    __slots__ = ('taxa', 'capacidade', 'fichas', 'atualizado')
+
+    def __init__(self, taxa: float, capacidade: float):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.fichas = capacidade
+        self.atualizado = time.monotonic()
+
+    def espera(self) -> float:
+        """Segundos até haver uma ficha disponível (0 = já pode)."""
+        agora = time.monotonic()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self.atualizado) * self.taxa)
+        self.atualizado = agora
+        return 0.0 if self.fichas >= 1 else (1 - self.fichas) / self.taxa
+
+    def consumir(self) -> None:
+        self.fichas -= 1
+
+
+class _Mensagem:
+    __slots__ = ('texto', 'parse_mode', 'enfileirada_em', 'tentativas', 'entrega')
+
+    def __init__(self, texto: str, parse_mode):
+        self.texto = texto
+        self.parse_mode = parse_mode
+        self.enfileirada_em = time.monotonic()
+        self.tentativas = 0
+        self.entrega = asyncio.get_running_loop().create_future()
+
+    def concluir(self, entregue: bool) -> None:
+        if not self.entrega.done():
+            self.entrega.set_result(entregue)
+
+
+class FilaEnvio:
+    """Fila de saída compartilhada pelos bots do Telegram.
+
+    Em vez de cada job chamar `bot.send_message` na hora, as mensagens
+    entram aqui e são enviadas por alguns trabalhadores que respeitam os
+    limites do Telegram (um balde de fichas global e um por chat). Quando
+    o Telegram responde com RetryAfter, o chat é pausado pelo tempo pedido
+    e as mensagens voltam para a frente da fila. Mensagens pendentes para o
+    mesmo chat são juntadas em uma só, até o limite de 4096 caracteres.
+    """
+
+    def __init__(self, trabalhadores: int = 4, taxa_global: float = TAXA_GLOBAL):
+        self._bot = None
+        self._quantidade_trabalhadores = trabalhadores
+        self._trabalhadores = []
+        self._balde_global = BaldeDeFichas(taxa_global, taxa_global)
+        self._baldes = {}             # chat_id → BaldeDeFichas
+        self._pendentes = {}          # chat_id → deque[_Mensagem]
+        self._prontos = asyncio.Queue()
+        self._na_fila = set()         # chats em _prontos ou aguardando balde/pausa
+        self._total_pendente = 0
+
+        # Métricas
+        self.enviadas = 0
+        self.mescladas = 0
+        self.falhas = 0
+        self.pausas_flood = 0
+        self.atraso_total = 0.0
+        self.atraso_maximo = 0.0
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self, bot) -> None:
+        self._bot = bot
+        for _ in range(self._quantidade_trabalhadores):
+            self._trabalhadores.append(asyncio.create_task(self._trabalhar()))
+
+    async def parar(self, tempo_limite: float = 10) -> None:
+        """Espera a fila esvaziar (até `tempo_limite` segundos) e para os trabalhadores.
+
+        Quem aguardava uma mensagem que não saiu a tempo recebe CancelledError.
+        """
+        limite = time.monotonic() + tempo_limite
+        while self.profundidade() and time.monotonic() < limite:
+            await asyncio.sleep(0.1)
+        for tarefa in self._trabalhadores:
+            tarefa.cancel()
+        self._trabalhadores.clear()
+        for fila in self._pendentes.values():
+            for mensagem in fila:
+                mensagem.entrega.cancel()
+
+    # --- API ---
+
+    def enviar(self, chat_id: int, texto: str, parse_mode: str = None) -> asyncio.Future:
+        """Enfileira uma mensagem; não bloqueia.
+
+        Devolve um future que termina com True quando a mensagem é entregue
+        ou False se ela for descartada (recusada pelo Telegram, falhas de
+        rede seguidas). Quem precisa saber da entrega, como os lembretes
+        persistidos, aguarda o future; os demais podem ignorá-lo.
+        """
+        mensagem = _Mensagem(texto, parse_mode)
+        self._pendentes.setdefault(chat_id, deque()).append(mensagem)
+        self._total_pendente += 1
+        if chat_id not in self._na_fila:
+            self._na_fila.add(chat_id)
+            self._prontos.put_nowait(chat_id)
+        return mensagem.entrega
+
+    def profundidade(self) -> int:
+        return self._total_pendente
+
+    def metricas(self) -> dict:
+        return {
+            'profundidade': self.profundidade(),
+            'chats_pendentes': len(self._pendentes),
+            'enviadas': self.enviadas,
+            'mescladas': self.mescladas,
+            'falhas': self.falhas,
+            'pausas_flood': self.pausas_flood,
+            'atraso_medio': self.atraso_total / self.enviadas if self.enviadas else 0.0,
+            'atraso_total': self.atraso_total,
+            'atraso_maximo': self.atraso_maximo,
+        }
+
+    # --- Trabalhadores ---
+
+    def _balde(self, chat_id: int) -> BaldeDeFichas:
+        balde = self._baldes.get(chat_id)
+        if balde is None:
+            # Ids negativos são grupos/canais, com limite bem menor
+            taxa = TAXA_GRUPO if chat_id < 0 else TAXA_CHAT_PRIVADO
+            balde = self._baldes[chat_id] = BaldeDeFichas(taxa, 1)
+        return balde
+
+    def _reagendar(self, chat_id: int, atraso: float) -> None:
+        asyncio.get_running_loop().call_later(atraso, self._prontos.put_nowait, chat_id)
+
+    def _juntar(self, fila: deque) -> list:
+        """Tira da frente da fila as mensagens que cabem em um único envio."""
+        lote = [fila.popleft()]
+        self._total_pendente -= 1
+        tamanho = len(lote[0].texto)
+        while fila and fila[0].parse_mode == lote[0].parse_mode and tamanho + 2 + len(fila[0].texto) <= LIMITE_MENSAGEM:
+            tamanho += 2 + len(fila[0].texto)
+            lote.append(fila.popleft())
+            self._total_pendente -= 1
+        return lote
+
+    async def _trabalhar(self) -> None:
+        while True:
+            chat_id = await self._prontos.get()
+            fila = self._pendentes.get(chat_id)
+            if not fila:
+                self._na_fila.discard(chat_id)
+                continue
+
+            # Limite do chat: volta para a fila sem prender o trabalhador
+            espera = self._balde(chat_id).espera()
+            if espera > 0:
+                self._reagendar(chat_id, espera)
+                continue
+
+            # Limite global: aguarda aqui mesmo
+            while (espera := self._balde_global.espera()) > 0:
+                await asyncio.sleep(espera)
+            self._balde_global.consumir()
+            self._baldes[chat_id].consumir()
+
+            lote = self._juntar(fila)
+            await self._enviar_lote(chat_id, fila, lote)
+
+            if fila:
+                self._prontos.put_nowait(chat_id)
+            else:
+                del self._pendentes[chat_id]
+                self._na_fila.discard(chat_id)
+                # O balde só pode sair da memória depois de recarregar
+                balde = self._baldes[chat_id]
+                asyncio.get_running_loop().call_later(1 / balde.taxa, self._descartar_balde, chat_id)
+
+    def _descartar_balde(self, chat_id: int) -> None:
+        if chat_id not in self._pendentes:
+            self._baldes.pop(chat_id, None)
+
+    async def _enviar_lote(self, chat_id: int, fila: deque, lote: list) -> None:
+        texto = "\n\n".join(m.texto for m in lote)
+        try:
+            await self._bot.send_message(chat_id=chat_id, text=texto, parse_mode=lote[0].parse_mode)
+        except RetryAfter as e:
+            espera = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+            logger.warning(f"Flood control no chat {chat_id}: aguardando {espera}s.")
+            self.pausas_flood += 1
+            fila.extendleft(reversed(lote))
+            self._total_pendente += len(lote)
+            # Impede que o trabalhador reenfileire o chat antes da pausa acabar
+            self._baldes[chat_id].fichas = 1 - espera * self._baldes[chat_id].taxa
+            return
+        except (BadRequest, Forbidden) as e:
+            # Erro definitivo (chat bloqueou o bot, texto inválido...): descarta
+            self.falhas += len(lote)
+            for m in lote:
+                m.concluir(False)
+            logger.error(f"Mensagem para o chat {chat_id} recusada pelo Telegram: {e}")
+            return
+        except NetworkError as e:
+            # Falha passageira de rede: tenta de novo algumas vezes
+            reenviar = [m for m in lote if m.tentativas < TENTATIVAS_REDE]
+            for m in lote:
+                if m.tentativas < TENTATIVAS_REDE:
+                    m.tentativas += 1
+                else:
+                    m.concluir(False)
+            fila.extendleft(reversed(reenviar))
+            self._total_pendente += len(reenviar)
+            self.falhas += len(lote) - len(reenviar)
+            logger.error(f"Erro de rede ao enviar para o chat {chat_id}: {e}")
+            return
+        except Exception as e:
+            self.falhas += len(lote)
+            for m in lote:
+                m.concluir(False)
+            logger.error(f"Erro ao enviar mensagem para o chat {chat_id}: {e}")
+            return
+
+        agora = time.monotonic()
+        for m in lote:
+            atraso = agora - m.enfileirada_em
+            self.atraso_total += atraso
+            self.atraso_maximo = max(self.atraso_maximo, atraso)
+            m.concluir(True)
+        self.enviadas += len(lote)
+        self.mescladas += len(lote) - 1
@@ -0,0 +1,214 @@
+"""Métricas dos bots no formato texto do Prometheus.
+
+O servidor só sobe se METRICAS_PORTA estiver definida (ex.: 9464) e escuta
+em METRICAS_ENDERECO (padrão 127.0.0.1). As métricas ficam em /metrics.
+"""
+import functools
+import logging
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+BALDES_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BALDES_ATRASO = (0.01, 0.05, 0.1, 0.5, 1, 5, 30, 60, 300, 3600)
+
+_registro = []
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _formatar_rotulos(nomes, valores, **extras) -> str:
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    pares += [f'{n}="{v}"' for n, v in extras.items()]
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+class Contador:
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._valores = {}
+        _registro.append(self)
+
+    def inc(self, *valores_rotulos, quantidade: float = 1) -> None:
+        self._valores[valores_rotulos] = self._valores.get(valores_rotulos, 0) + quantidade
+
+    def exportar(self) -> list:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        for valores, total in self._valores.items():
+            linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {total}")
+        return linhas
+
+
+class Histograma:
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple = (), baldes: tuple = BALDES_PADRAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.baldes = baldes
+        self._series = {}     # valores dos rótulos → [contagens por balde..., soma, total]
+        _registro.append(self)
+
+    def observar(self, valor: float, *valores_rotulos) -> None:
+        serie = self._series.get(valores_rotulos)
+        if serie is None:
+            serie = self._series[valores_rotulos] = [0] * (len(self.baldes) + 2)
+        indice = bisect_left(self.baldes, valor)
+        if indice < len(self.baldes):
+            serie[indice] += 1
+        serie[-2] += valor
+        serie[-1] += 1
+
+    def exportar(self) -> list:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        for valores, serie in self._series.items():
+            acumulado = 0
+            for limite, contagem in zip(self.baldes, serie):
+                acumulado += contagem
+                linhas.append(f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, valores, le=limite)} {acumulado}")
+            linhas.append(f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, valores, le='+Inf')} {serie[-1]}")
+            linhas.append(f"{self.nome}_sum{_formatar_rotulos(self.rotulos, valores)} {serie[-2]}")
+            linhas.append(f"{self.nome}_count{_formatar_rotulos(self.rotulos, valores)} {serie[-1]}")
+        return linhas
+
+
+class Medidor:
+    """Valor lido na hora da coleta; `funcao` devolve {valores dos rótulos: valor}."""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple, funcao, tipo: str = 'gauge'):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.funcoes = [funcao]
+        self.tipo = tipo
+        _registro.append(self)
+
+    def exportar(self) -> list:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for funcao in self.funcoes:
+            for valores, valor in funcao().items():
+                linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, valores)} {valor}")
+        return linhas
+
+
+def registrar_medidor(nome: str, ajuda: str, rotulos: tuple, funcao, tipo: str = 'gauge') -> None:
+    """Adiciona uma fonte a um medidor, criando-o na primeira vez (vários bots podem contribuir)."""
+    for metrica in _registro:
+        if isinstance(metrica, Medidor) and metrica.nome == nome:
+            metrica.funcoes.append(funcao)
+            return
+    Medidor(nome, ajuda, rotulos, funcao, tipo)
+
+
+def exportar_texto() -> str:
+    linhas = []
+    for metrica in _registro:
+        try:
+            linhas.extend(metrica.exportar())
+        except Exception as e:
+            logger.error(f"Erro ao coletar a métrica {metrica.nome}: {e}")
+    return "\n".join(linhas) + "\n"
+
+
+# --- Métricas comuns ---
+
+COMANDOS = Contador("bot_comandos_total", "Comandos executados.", ("bot", "comando"))
+ERROS = Contador("bot_comandos_erros_total", "Comandos que terminaram com exceção.", ("bot", "comando"))
+DURACAO = Histograma("bot_comando_duracao_segundos", "Tempo total do handler do comando.", ("bot", "comando"))
+ATE_RESPOSTA = Histograma(
+    "bot_comando_tempo_ate_resposta_segundos",
+    "Tempo até o primeiro defer/resposta da interação (Discord).",
+    ("bot", "comando")
+)
+HTTP_DURACAO = Histograma("bot_http_duracao_segundos", "Duração das chamadas HTTP às APIs externas.", ("host",))
+HTTP_ERROS = Contador("bot_http_erros_total", "Chamadas HTTP às APIs externas que falharam.", ("host",))
+ATRASO_JOBS = Histograma(
+    "bot_job_atraso_segundos",
+    "Diferença entre o horário agendado e o disparo real de jobs e temporizadores.",
+    ("bot",),
+    baldes=BALDES_ATRASO
+)
+
+
+# --- Instrumentação de handlers ---
+
+# [bot, comando, início, já_respondeu] do comando em execução nesta tarefa
+_comando_atual = ContextVar('comando_atual', default=None)
+
+
+def medir_comando(bot: str, comando: str, funcao):
+    """Envolve um handler assíncrono contando chamadas, erros e duração."""
+    @functools.wraps(funcao)
+    async def medido(*args, **kwargs):
+        estado = [bot, comando, time.perf_counter(), False]
+        token = _comando_atual.set(estado)
+        try:
+            return await funcao(*args, **kwargs)
+        except Exception:
+            ERROS.inc(bot, comando)
+            raise
+        finally:
+            COMANDOS.inc(bot, comando)
+            DURACAO.observar(time.perf_counter() - estado[2], bot, comando)
+            _comando_atual.reset(token)
+    return medido
+
+
+def instrumentar_respostas(classe, metodos=('defer', 'send_message')) -> None:
+    """Mede o tempo até a primeira resposta envolvendo os métodos da classe de resposta."""
+    for nome in metodos:
+        original = getattr(classe, nome)
+        if getattr(original, '_medido', False):
+            continue
+
+        def criar(original):
+            @functools.wraps(original)
+            async def medido(self, *args, **kwargs):
+                estado = _comando_atual.get()
+                if estado is not None and not estado[3]:
+                    estado[3] = True
+                    ATE_RESPOSTA.observar(time.perf_counter() - estado[2], estado[0], estado[1])
+                return await original(self, *args, **kwargs)
+            medido._medido = True
+            return medido
+
+        setattr(classe, nome, criar(original))
+
+
+# --- Servidor HTTP ---
+
+_servidor = None
+
+
+async def iniciar_servidor() -> None:
+    """Sobe o endpoint /metrics uma única vez por processo (se METRICAS_PORTA estiver definida)."""
+    global _servidor
+    porta = os.getenv("METRICAS_PORTA")
+    if _servidor is not None or not porta:
+        return
+
+    from aiohttp import web
+
+    async def metrics(request):
+        return web.Response(text=exportar_texto(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', metrics)
+    _servidor = web.AppRunner(app)
+    await _servidor.setup()
+    endereco = os.getenv("METRICAS_ENDERECO", "127.0.0.1")
+    await web.TCPSite(_servidor, endereco, int(porta)).start()
+    logger.info(f"Métricas disponíveis em http://{endereco}:{porta}/metrics")
+
+
+async def parar_servidor() -> None:
+    global _servidor
+    if _servidor is not None:
+        await _servidor.cleanup()
+        _servidor = None
@@ -0,0 +1,185 @@
+"""Runtime que hospeda vários bots no mesmo processo e no mesmo event loop.
+
+Variáveis de ambiente:
+    BOTS               bots habilitados, separados por vírgula
+                       (padrão: lembretes,checklist,discord)
+    LEMBRETES_TOKEN    token do LembretesDD (ou TELEGRAM_TOKEN no .env da pasta dele)
+    CHECKLIST_TOKEN    token do ChecklistDD (ou TELEGRAM_TOKEN no .env da pasta dele)
+    DISCORD_TOKEN      token do bot do Discord (ou TOKEN no .env da pasta dele)
+    METRICAS_PORTA     porta do endpoint /metrics (desligado se vazia); um só
+                       endpoint reúne as métricas de todos os bots
+    MODO_ATUALIZACAO   polling (padrão) ou webhook, com as mesmas variáveis
+                       WEBHOOK_* de comum/execucao.py. No modo webhook os
+                       bots do Telegram dividem um único servidor, cada um
+                       em WEBHOOK_CAMINHO/<nome> (ex.: /telegram/lembretes)
+    <NOME>_PERSISTENCIA_DB  arquivo de persistência de cada bot do Telegram
+                       (PERSISTENCIA_DB sozinha faria os bots dividirem o arquivo)
+
+As configurações próprias de cada bot (FUSO_HORARIO, AGENDA_DB,
+POLITICA_ATRASO, TRABALHADORES_ENVIO...) vêm do .env da pasta dele, lido
+por comum.ambiente sem passar pelo os.environ: o .env de um bot não vaza
+para os outros. Para trocar uma delas só para um bot, use
+<NOME>_<VARIAVEL> (ex.: CHECKLIST_FUSO_HORARIO); sem o prefixo, uma
+variável do ambiente (ou do .env da raiz) vale para todos os bots.
+
+Os bots compartilham o interpretador, o event loop, o pool HTTP de
+comum.cliente_http, a configuração de logging e o código de persistência,
+agenda e fila de envio. Cada bot continua gravando os dados na própria
+pasta, então dá para alternar entre rodar sozinho e rodar por aqui.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+import signal
+import sys
+from pathlib import Path
+
+from aiohttp import web
+from dotenv import dotenv_values, load_dotenv
+
+from comum import metricas
+from comum.cliente_http import http
+from comum.execucao import (
+    adicionar_rota_webhook, configuracao_webhook, iniciar_servidor_webhook, modo_atualizacao, registrar_webhook
+)
+
+logger = logging.getLogger(__name__)
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+# nome → (arquivo principal, variável do token no .env da pasta do bot, tipo)
+BOTS = {
+    'lembretes': (RAIZ / 'Telegram' / 'LembretesDD' / 'main.py', 'TELEGRAM_TOKEN', 'telegram'),
+    'checklist': (RAIZ / 'Telegram' / 'ChecklistDD' / 'main.py', 'TELEGRAM_TOKEN', 'telegram'),
+    'discord': (RAIZ / 'Discord' / 'main.py', 'TOKEN', 'discord'),
+}
+
+
+def configurar_logging() -> None:
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+
+
+def carregar_bot(nome: str):
+    """Importa o main.py do bot com um nome de módulo único (todos se chamam main)."""
+    caminho = BOTS[nome][0]
+    # Os módulos auxiliares de cada bot (indice, tarefas, clima...) ficam na pasta dele
+    sys.path.insert(0, str(caminho.parent))
+    spec = importlib.util.spec_from_file_location(f"bot_{nome}", caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def token_do_bot(nome: str) -> str:
+    """Cada bot tem o próprio token; no mesmo processo não dá para usar uma única variável."""
+    caminho, variavel, _ = BOTS[nome]
+    return os.getenv(f"{nome.upper()}_TOKEN") or dotenv_values(caminho.parent / '.env').get(variavel)
+
+
+async def _iniciar_telegram(application, nome: str, webhook: dict = None, app_web=None) -> None:
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    if webhook is None:
+        await application.updater.start_polling()
+    else:
+        caminho = f"{webhook['caminho'].rstrip('/')}/{nome}"
+        if webhook['url_publica']:
+            await registrar_webhook(application, webhook['url_publica'], caminho, webhook['segredo'])
+        adicionar_rota_webhook(app_web, application, webhook['segredo'], caminho)
+    await application.start()
+
+
+async def _parar_telegram(application) -> None:
+    if application.updater.running:
+        await application.updater.stop()
+    if application.running:
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+    await application.shutdown()
+    if application.post_shutdown:
+        await application.post_shutdown(application)
+
+
+async def executar_bots(nomes: list, webhook: dict = None) -> None:
+    """Roda os bots até SIGINT/SIGTERM; `webhook` (de configuracao_webhook) troca o polling pelo servidor HTTP."""
+    if sum(1 for n in nomes if BOTS[n][2] == 'telegram') > 1 and os.getenv("PERSISTENCIA_DB"):
+        logger.critical("PERSISTENCIA_DB faria os bots dividirem o arquivo; use <NOME>_PERSISTENCIA_DB.")
+        return
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, parar.set)
+        except (NotImplementedError, RuntimeError):
+            # Windows: Ctrl+C cancela o asyncio.run e cai no finally
+            pass
+
+    aplicacoes, tarefas = [], []
+    app_web = web.Application() if webhook is not None else None
+    servidor_webhook = None
+    try:
+        for nome in nomes:
+            token = token_do_bot(nome)
+            if not token:
+                logger.error(f"Token do bot '{nome}' não encontrado; ele não será iniciado.")
+                continue
+
+            # Importado dentro do loop: o nextcord associa o bot ao loop atual
+            modulo = carregar_bot(nome)
+            if BOTS[nome][2] == 'telegram':
+                application = modulo.criar_aplicacao(token)
+                await _iniciar_telegram(application, nome, webhook, app_web)
+                aplicacoes.append(application)
+            else:
+                tarefa = asyncio.create_task(modulo.bot.start(token), name=nome)
+                # Se o bot do Discord cair, derruba o runtime em vez de seguir pela metade
+                tarefa.add_done_callback(lambda _: parar.set())
+                tarefas.append((modulo.bot, tarefa))
+            logger.info(f"Bot '{nome}' iniciado.")
+
+        if webhook is not None and aplicacoes:
+            servidor_webhook = await iniciar_servidor_webhook(app_web, webhook['escutar'], webhook['porta'])
+            logger.info(f"Webhook ouvindo em http://{webhook['escutar']}:{webhook['porta']}{webhook['caminho'].rstrip('/')}/<bot>")
+
+        if aplicacoes or tarefas:
+            await parar.wait()
+    finally:
+        if servidor_webhook is not None:
+            await servidor_webhook.cleanup()
+        for application in aplicacoes:
+            await _parar_telegram(application)
+        for bot, tarefa in tarefas:
+            await bot.close()
+            if tarefa.done() and not tarefa.cancelled() and tarefa.exception():
+                logger.error(f"O bot do Discord parou com erro: {tarefa.exception()}")
+        await http.fechar()
+        await metricas.parar_servidor()
+
+
+def main() -> None:
+    load_dotenv(RAIZ / '.env')
+    configurar_logging()
+
+    nomes = [n.strip().lower() for n in os.getenv("BOTS", ",".join(BOTS)).split(",") if n.strip()]
+    desconhecidos = [n for n in nomes if n not in BOTS]
+    if desconhecidos:
+        logger.critical(f"Bots desconhecidos em BOTS: {', '.join(desconhecidos)}. Opções: {', '.join(BOTS)}.")
+        return
+
+    modo = modo_atualizacao()
+    if modo is None:
+        return
+    webhook = None
+    if modo == 'webhook':
+        webhook = configuracao_webhook()
+        if webhook is None:
+            return
+
+    asyncio.run(executar_bots(nomes, webhook))
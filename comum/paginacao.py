@@ -0,0 +1,84 @@
+"""Escape de Markdown e listas paginadas para os bots do Telegram.
+
+Uma página é montada só com os itens dela, a partir de uma posição na
+lista já ordenada, e nunca passa do limite de tamanho de uma mensagem.
+Os botões ◀/▶ levam a posição no callback_data, então cada clique
+renderiza apenas a página pedida.
+"""
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from comum.fila_envio import LIMITE_MENSAGEM
+
+ITENS_POR_PAGINA = 20
+# Descrições muito longas são cortadas na listagem para caberem várias por página
+LIMITE_DESCRICAO = 500
+# Espaço reservado para a linha "Itens x–y de n"
+_RESERVA_INDICADOR = 40
+
+# Tabelas de tradução montadas uma única vez
+_MARKDOWN_V2 = str.maketrans({c: '\\' + c for c in '\\_*[]()~`>#+-=|{}.!'})
+_MARKDOWN = str.maketrans({c: '\\' + c for c in '_*`['})
+
+
+def escapar_markdown_v2(texto: str) -> str:
+    """Escapa todos os caracteres reservados do MarkdownV2."""
+    return texto.translate(_MARKDOWN_V2)
+
+
+def escapar_markdown(texto: str) -> str:
+    """Escapa os caracteres reservados do Markdown antigo (parse_mode='Markdown')."""
+    return texto.translate(_MARKDOWN)
+
+
+def resumir(texto: str, limite: int = LIMITE_DESCRICAO) -> str:
+    return texto if len(texto) <= limite else texto[:limite - 1] + "…"
+
+
+def _inicio_anterior(itens: list, inicio: int, formatar, espaco: int) -> int:
+    """Onde começa a página que termina logo antes de `inicio`."""
+    i, tamanho = inicio, 0
+    while i > 0 and inicio - i < ITENS_POR_PAGINA:
+        linha = formatar(i - 1, itens[i - 1])
+        if i < inicio and tamanho + len(linha) > espaco:
+            break
+        tamanho += len(linha)
+        i -= 1
+    return i
+
+
+def montar_pagina(itens: list, inicio: int, formatar, cabecalho: str, rodape: str, prefixo: str) -> tuple:
+    """Devolve (texto, teclado) da página que começa no item `inicio`.
+
+    `formatar(posicao, item)` devolve a linha do item, já escapada e com a
+    quebra de linha. `prefixo` identifica a lista no callback_data dos
+    botões, que fica "<prefixo>:<início da página>".
+    """
+    inicio = max(0, min(inicio, len(itens) - 1))
+    espaco = LIMITE_MENSAGEM - len(cabecalho) - len(rodape) - _RESERVA_INDICADOR
+
+    linhas, tamanho, fim = [], 0, inicio
+    while fim < len(itens) and fim - inicio < ITENS_POR_PAGINA:
+        linha = formatar(fim, itens[fim])
+        if fim > inicio and tamanho + len(linha) > espaco:
+            break
+        linhas.append(linha)
+        tamanho += len(linha)
+        fim += 1
+
+    botoes = []
+    if inicio > 0:
+        anterior = _inicio_anterior(itens, inicio, formatar, espaco)
+        botoes.append(InlineKeyboardButton("◀ Anterior", callback_data=f"{prefixo}:{anterior}"))
+    if fim < len(itens):
+        botoes.append(InlineKeyboardButton("Próxima ▶", callback_data=f"{prefixo}:{fim}"))
+
+    partes = [cabecalho, *linhas]
+    if botoes:
+        partes.append(f"\nItens {inicio + 1}–{fim} de {len(itens)}\n")
+    partes.append(rodape)
+    return "".join(partes), InlineKeyboardMarkup([botoes]) if botoes else None
+
+
+def posicao_do_callback(dados: str) -> int:
+    """Extrai o início da página de um callback_data "<prefixo>:<início>"."""
+    return int(dados.rsplit(':', 1)[1])
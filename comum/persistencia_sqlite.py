@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+import pickle
+import sqlite3
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+USUARIO = 'usuario'
+CHAT = 'chat'
+BOT = 'bot'
+CALLBACK = 'callback'
+CONVERSA = 'conversa'
+
+
+class _UnpicklerTolerante(pickle.Unpickler):
+    """Lê arquivos do PicklePersistence sem precisar da instância do Bot."""
+
+    def persistent_load(self, pid):
+        return None
+
+
+class PersistenciaSQLite(BasePersistence):
+    """Persistência do python-telegram-bot com uma linha por usuário/chat.
+
+    Diferente do PicklePersistence, que reescreve o arquivo inteiro a cada
+    flush, aqui:
+
+    - só os usuários/chats alterados desde a última escrita são gravados,
+      todos na mesma transação;
+    - os dados de um usuário só são lidos do disco na primeira vez que ele
+      interage com o bot (via `refresh_user_data`), e não todos no início.
+
+    `migrar_de` aponta para um arquivo antigo do PicklePersistence; se o
+    banco estiver vazio, o conteúdo dele é importado uma única vez.
+    """
+
+    def __init__(self, caminho_banco: str, migrar_de: str = None, update_interval: float = 60):
+        super().__init__(store_data=PersistenceInput(), update_interval=update_interval)
+        self._banco = sqlite3.connect(caminho_banco)
+        self._banco.execute(
+            "CREATE TABLE IF NOT EXISTS dados ("
+            " tipo TEXT NOT NULL,"
+            " chave TEXT NOT NULL,"
+            " valor BLOB NOT NULL,"
+            " PRIMARY KEY (tipo, chave))"
+        )
+        self._banco.commit()
+
+        self._carregados = {USUARIO: set(), CHAT: set()}
+        self._pendentes = {}          # (tipo, chave) → bytes, ou None para apagar
+        self._conversas = {}
+        self._escrita_agendada = False
+
+        if migrar_de and os.path.exists(migrar_de) and self._vazio():
+            self._importar_pickle(migrar_de)
+
+    # --- Acesso ao banco ---
+
+    def _vazio(self) -> bool:
+        return self._banco.execute("SELECT 1 FROM dados LIMIT 1").fetchone() is None
+
+    def _ler(self, tipo: str, chave):
+        linha = self._banco.execute(
+            "SELECT valor FROM dados WHERE tipo = ? AND chave = ?", (tipo, str(chave))
+        ).fetchone()
+        return pickle.loads(linha[0]) if linha else None
+
+    def _importar_pickle(self, caminho: str) -> None:
+        with open(caminho, 'rb') as arquivo:
+            antigo = _UnpicklerTolerante(arquivo).load()
+
+        linhas = []
+        for tipo, secao in ((USUARIO, 'user_data'), (CHAT, 'chat_data')):
+            for chave, valor in (antigo.get(secao) or {}).items():
+                linhas.append((tipo, str(chave), pickle.dumps(valor)))
+        if antigo.get('bot_data') is not None:
+            linhas.append((BOT, '', pickle.dumps(antigo['bot_data'])))
+        if antigo.get('callback_data') is not None:
+            linhas.append((CALLBACK, '', pickle.dumps(antigo['callback_data'])))
+        for nome, conversa in (antigo.get('conversations') or {}).items():
+            linhas.append((CONVERSA, nome, pickle.dumps(conversa)))
+
+        with self._banco:
+            self._banco.executemany("INSERT OR REPLACE INTO dados (tipo, chave, valor) VALUES (?, ?, ?)", linhas)
+        logger.info(f"{len(linhas)} registro(s) importado(s) de {caminho}.")
+
+    # --- Escrita em lote ---
+
+    def _marcar(self, tipo: str, chave, valor) -> None:
+        # Serializa agora: o dicionário continua sendo alterado pelos handlers
+        self._pendentes[(tipo, str(chave))] = None if valor is None else pickle.dumps(valor)
+        if not self._escrita_agendada:
+            self._escrita_agendada = True
+            # O Application chama update_* para todos os alterados em sequência;
+            # a gravação roda logo depois, em uma única transação.
+            asyncio.get_running_loop().call_soon(self._gravar_pendentes)
+
+    def _gravar_pendentes(self) -> None:
+        self._escrita_agendada = False
+        if not self._pendentes:
+            return
+        gravar = [(t, c, v) for (t, c), v in self._pendentes.items() if v is not None]
+        apagar = [(t, c) for (t, c), v in self._pendentes.items() if v is None]
+        self._pendentes.clear()
+        with self._banco:
+            if gravar:
+                self._banco.executemany("INSERT OR REPLACE INTO dados (tipo, chave, valor) VALUES (?, ?, ?)", gravar)
+            if apagar:
+                self._banco.executemany("DELETE FROM dados WHERE tipo = ? AND chave = ?", apagar)
+
+    # --- Carregamento (preguiçoso para usuários e chats) ---
+
+    async def get_user_data(self) -> dict:
+        return {}
+
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return self._ler(BOT, '') or {}
+
+    async def get_callback_data(self):
+        return self._ler(CALLBACK, '')
+
+    async def get_conversations(self, name: str) -> dict:
+        if name not in self._conversas:
+            self._conversas[name] = self._ler(CONVERSA, name) or {}
+        return dict(self._conversas[name])
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        if user_id in self._carregados[USUARIO]:
+            return
+        self._carregados[USUARIO].add(user_id)
+        salvo = self._ler(USUARIO, user_id)
+        if salvo:
+            user_data.update(salvo)
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        if chat_id in self._carregados[CHAT]:
+            return
+        self._carregados[CHAT].add(chat_id)
+        salvo = self._ler(CHAT, chat_id)
+        if salvo:
+            chat_data.update(salvo)
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
+
+    # --- Atualização ---
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        self._carregados[USUARIO].add(user_id)
+        self._marcar(USUARIO, user_id, data)
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        self._carregados[CHAT].add(chat_id)
+        self._marcar(CHAT, chat_id, data)
+
+    async def update_bot_data(self, data: dict) -> None:
+        self._marcar(BOT, '', data)
+
+    async def update_callback_data(self, data) -> None:
+        self._marcar(CALLBACK, '', data)
+
+    async def update_conversation(self, name: str, key, new_state) -> None:
+        await self.get_conversations(name)
+        conversas = self._conversas[name]
+        if new_state is None:
+            conversas.pop(key, None)
+        else:
+            conversas[key] = new_state
+        self._marcar(CONVERSA, name, conversas)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._carregados[USUARIO].discard(user_id)
+        self._marcar(USUARIO, user_id, None)
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        self._carregados[CHAT].discard(chat_id)
+        self._marcar(CHAT, chat_id, None)
+
+    def ids_usuarios(self) -> list:
+        """Ids de todos os usuários gravados, sem carregar os dados deles."""
+        linhas = self._banco.execute("SELECT chave FROM dados WHERE tipo = ?", (USUARIO,))
+        return [int(chave) for (chave,) in linhas]
+
+    async def flush(self) -> None:
+        self._gravar_pendentes()
+        self._banco.close()
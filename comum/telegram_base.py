@@ -0,0 +1,111 @@
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+from apscheduler.events import EVENT_JOB_SUBMITTED
+from telegram.ext import Application, CommandHandler
+
+from comum import metricas
+from comum.ambiente import ambiente_do_bot
+from comum.execucao import atualizacoes_concorrentes
+from comum.persistencia_sqlite import PersistenciaSQLite
+
+logger = logging.getLogger(__name__)
+
+
+def abrir_persistencia(diretorio: Path, nome: str = None) -> PersistenciaSQLite:
+    """Persistência do bot guardada na pasta dele, seja qual for o diretório atual.
+
+    Assim o mesmo arquivo é usado rodando o bot sozinho ou pelo runtime
+    compartilhado (bots.py). O caminho pode ser trocado por
+    <NOME>_PERSISTENCIA_DB (ex.: LEMBRETES_PERSISTENCIA_DB) ou por
+    PERSISTENCIA_DB (no ambiente, para um bot só, ou no .env da pasta
+    dele); caminhos relativos partem da pasta do bot. O
+    arquivo antigo do PicklePersistence, se existir, é importado na
+    primeira execução.
+    """
+    caminho = diretorio / "bot_persistence.db"
+    if nome is not None:
+        caminho = diretorio / (ambiente_do_bot(diretorio, nome).get("PERSISTENCIA_DB") or caminho)
+    return PersistenciaSQLite(
+        str(caminho),
+        migrar_de=str(diretorio / "bot_persistence")
+    )
+
+
+def instrumentar(application: Application, nome: str) -> None:
+    """Liga as métricas de comandos e de atraso dos jobs de um bot.
+
+    Envolve o callback de todos os CommandHandler já registrados e mede,
+    para cada job do JobQueue, quanto ele disparou depois do horário
+    agendado (reinícios, event loop ocupado...).
+    """
+    for handlers in application.handlers.values():
+        for handler in handlers:
+            if isinstance(handler, CommandHandler):
+                comando = "/" + sorted(handler.commands)[0]
+                handler.callback = metricas.medir_comando(nome, comando, handler.callback)
+
+    def registrar_atraso(evento) -> None:
+        atraso = datetime.now(timezone.utc) - evento.scheduled_run_times[0]
+        metricas.ATRASO_JOBS.observar(max(atraso.total_seconds(), 0), nome)
+
+    if application.job_queue is not None:
+        application.job_queue.scheduler.add_listener(registrar_atraso, EVENT_JOB_SUBMITTED)
+
+
+# Métrica → (campo de FilaEnvio.metricas(), tipo, ajuda)
+_METRICAS_FILA = {
+    "bot_fila_envio_profundidade": ('profundidade', 'gauge', "Mensagens aguardando envio."),
+    "bot_fila_envio_chats_pendentes": ('chats_pendentes', 'gauge', "Chats com mensagens aguardando envio."),
+    "bot_fila_envio_atraso_maximo_segundos": ('atraso_maximo', 'gauge', "Maior atraso entre enfileirar e entregar."),
+    "bot_fila_envio_enviadas_total": ('enviadas', 'counter', "Mensagens entregues."),
+    "bot_fila_envio_mescladas_total": ('mescladas', 'counter', "Mensagens juntadas a outra do mesmo chat."),
+    "bot_fila_envio_falhas_total": ('falhas', 'counter', "Mensagens descartadas após erro."),
+    "bot_fila_envio_pausas_flood_total": ('pausas_flood', 'counter', "Pausas pedidas pelo Telegram (RetryAfter)."),
+    "bot_fila_envio_atraso_segundos_total": ('atraso_total', 'counter', "Soma dos atrasos das mensagens entregues."),
+}
+
+
+def registrar_metricas_fila(nome: str, fila_envio) -> None:
+    """Uma métrica por campo da fila, com o tipo certo para o Prometheus (rate() nos contadores)."""
+    for metrica, (campo, tipo, ajuda) in _METRICAS_FILA.items():
+        metricas.registrar_medidor(
+            metrica, ajuda, ("bot",), lambda campo=campo: {(nome,): fila_envio.metricas()[campo]}, tipo=tipo
+        )
+
+
+def construir_aplicacao(token: str, nome: str, persistencia, fila_envio, ao_iniciar=None, request=None) -> Application:
+    """Monta o Application com a configuração comum aos bots do Telegram.
+
+    A fila de envio é iniciada junto com o bot e esvaziada antes de ele
+    parar. `ao_iniciar` é uma corrotina opcional com o que for específico
+    de cada bot (restaurar jobs, agendar varreduras...). `nome` identifica
+    o bot nas métricas. `request` substitui o transporte HTTP do Telegram.
+    """
+    async def iniciar(application: Application) -> None:
+        instrumentar(application, nome)
+        registrar_metricas_fila(nome, fila_envio)
+        await metricas.iniciar_servidor()
+        fila_envio.iniciar(application.bot)
+        if ao_iniciar is not None:
+            await ao_iniciar(application)
+
+    async def encerrar(application: Application) -> None:
+        # Entrega o que ainda estiver na fila antes de desligar
+        await fila_envio.parar()
+        logger.info(f"Fila de envio encerrada: {fila_envio.metricas()}")
+
+    construtor = (
+        Application.builder()
+        .token(token)
+        .persistence(persistencia)
+        .post_init(iniciar)
+        .post_stop(encerrar)
+        .concurrent_updates(atualizacoes_concorrentes())
+    )
+    if request is not None:
+        # Transporte alternativo (ex.: o Telegram falso dos benchmarks)
+        return construtor.request(request).get_updates_request(request).build()
+    # Permite que os trabalhadores da fila enviem em paralelo
+    return construtor.connection_pool_size(8).build()